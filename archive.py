@@ -0,0 +1,192 @@
+"""
+상세 페이지 본문을 압축해 로컬 디스크에 보관하는 아카이브
+
+키는 정규화된 상세 URL의 SHA-256 해시이고, 파일은 zstd(설치된 경우) 또는 gzip으로
+압축합니다. 전체 크기가 ARCHIVE_MAX_BYTES를 넘으면 가장 오래 접근하지 않은 파일부터
+지웁니다(LRU, 파일 mtime을 접근 시각으로 사용).
+
+새 작업이 추가되면 같은 목록 URL에서 모은 본문을 다시 내려받지 않고 여기서 검색해
+과거 글에 대한 알림을 채웁니다. (backfill_task)
+
+ARCHIVE_DIR 환경 변수가 설정된 경우에만 사용합니다.
+"""
+
+import os
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "")
+ARCHIVE_MAX_BYTES = int(os.getenv("ARCHIVE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+class PageArchive:
+    def __init__(self, root: str, max_bytes: int = ARCHIVE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.suffix = ".zst" if zstandard else ".gz"
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "sources"), exist_ok=True)
+        self._total_bytes = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    def _entry_paths(self) -> Iterator[str]:
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if name != "sources"]
+            for name in filenames:
+                if name.endswith((".zst", ".gz")):
+                    yield os.path.join(dirpath, name)
+
+    def _path(self, key: str, suffix: Optional[str] = None) -> str:
+        return os.path.join(self.root, key[:2], key + (suffix or self.suffix))
+
+    def _source_path(self, source_url: str) -> str:
+        return os.path.join(self.root, "sources", _digest(source_url) + ".txt")
+
+    def _compress(self, data: bytes) -> bytes:
+        if zstandard:
+            return zstandard.ZstdCompressor(level=9).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(path: str, data: bytes) -> bytes:
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError(f"zstandard is required to read {path}")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def put(self, url: str, source_url: str, text: str):
+        """
+        본문을 저장하고, 목록 URL(source_url)별 색인에 키를 추가합니다.
+        """
+        key = _digest(url)
+        header = {
+            "url": url,
+            "source": source_url,
+            "archived_at": datetime.utcnow().isoformat(),
+        }
+        payload = self._compress(
+            (json.dumps(header, ensure_ascii=False) + "\n" + text).encode("utf-8")
+        )
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            previous = os.path.getsize(path) if os.path.exists(path) else None
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self._total_bytes += len(payload) - (previous or 0)
+            if previous is None:
+                with open(self._source_path(source_url), "a", encoding="utf-8") as f:
+                    f.write(key + "\n")
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def get(self, url: str) -> Optional[str]:
+        entry = self._read(_digest(url))
+        return entry[1] if entry else None
+
+    def _read(self, key: str) -> Optional[tuple[dict, str]]:
+        for suffix in (".zst", ".gz"):
+            path = self._path(key, suffix)
+            try:
+                with open(path, "rb") as f:
+                    data = self._decompress(path, f.read())
+            except FileNotFoundError:
+                continue
+            os.utime(path)  # LRU 접근 시각 갱신
+            header, _, text = data.decode("utf-8").partition("\n")
+            return json.loads(header), text
+        return None
+
+    def iter_source(self, source_url: str) -> Iterator[tuple[str, str]]:
+        """
+        source_url 목록에서 모은 (상세 URL, 본문)을 저장 순서대로 돌려줍니다.
+        """
+        try:
+            with open(self._source_path(source_url), encoding="utf-8") as f:
+                keys = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        except FileNotFoundError:
+            return
+        for key in keys:
+            entry = self._read(key)
+            if entry is not None:
+                yield entry[0]["url"], entry[1]
+
+    def _evict(self):
+        """
+        전체 크기가 상한의 90% 아래로 내려갈 때까지 오래된 파일부터 지웁니다.
+        """
+        target = int(self.max_bytes * 0.9)
+        entries = []
+        for path in self._entry_paths():
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        evicted: set[str] = set()
+        for _, size, path in entries:
+            if self._total_bytes <= target:
+                break
+            os.remove(path)
+            self._total_bytes -= size
+            evicted.add(os.path.basename(path).split(".")[0])
+        # 같은 키가 다른 압축 형식으로 남아 있으면 색인에서 지우지 않습니다.
+        evicted = {
+            key
+            for key in evicted
+            if not any(os.path.exists(self._path(key, suffix)) for suffix in (".zst", ".gz"))
+        }
+        self._prune_sources(evicted)
+        logger.info(f"Evicted {len(evicted)} archived pages ({self._total_bytes} bytes left)")
+
+    def _prune_sources(self, keys: set[str]):
+        """
+        지운 키를 목록 URL별 색인에서 빼고, 비어 버린 색인 파일은 지웁니다.
+        """
+        if not keys:
+            return
+        sources_dir = os.path.join(self.root, "sources")
+        for name in os.listdir(sources_dir):
+            if not name.endswith(".txt"):
+                continue
+            path = os.path.join(sources_dir, name)
+            with open(path, encoding="utf-8") as f:
+                lines = [line.strip() for line in f if line.strip()]
+            kept = [key for key in lines if key not in keys]
+            if len(kept) == len(lines):
+                continue
+            if not kept:
+                os.remove(path)
+                continue
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write("".join(key + "\n" for key in kept))
+            os.replace(tmp_path, path)
+
+
+_default_archive: Optional[PageArchive] = None
+
+
+def default_archive() -> Optional[PageArchive]:
+    global _default_archive
+    if not ARCHIVE_DIR:
+        return None
+    if _default_archive is None:
+        _default_archive = PageArchive(ARCHIVE_DIR)
+    return _default_archive
@@ -0,0 +1,163 @@
+"""
+크롤러 전체 경로 벤치마크: 로컬 게시판 서버 + SQLite
+
+사용법:
+    python benchmarks/bench_crawl.py [--boards 10 --tasks-per-board 2 --latency-ms 20 --runs 3]
+
+fixture_server.py로 게시판을 띄우고, 임시 SQLite DB에 작업을 만든 뒤 check_all_tasks
+(--mode all) 또는 작업별 perform_check(--mode single)를 여러 번 실행합니다.
+첫 실행은 전체 크롤링, 이후 실행은 게시판 절반에 새 글을 올린 증분 크롤링입니다.
+
+실행마다 pages/sec, URL 그룹(=목록 URL) 처리 시간 p50/p95, DB 쿼리 수, 최대 RSS를 출력합니다.
+호스트별 요청 간격 제한은 벤치마크에서 풀어 둡니다(HOST_RATE 등 환경 변수로 덮어쓸 수 있음).
+"""
+
+import os
+import sys
+import argparse
+import resource
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import KEYWORDS, BoardConfig, FixtureServer  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> tuple[float, float]:
+    """
+    (이 프로세스, 종료된 자식 프로세스 중 최대) RSS. Linux의 ru_maxrss 단위는 KB입니다.
+    """
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--links", type=int, default=20, help="links per list page")
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-etag", action="store_true")
+    parser.add_argument("--tasks-per-board", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--new-posts", type=int, default=5, help="posts added per run")
+    parser.add_argument("--mode", choices=["all", "single"], default="all")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_crawl_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+    for name, value in {
+        "HOST_RATE": "10000",
+        "HOST_BURST": "10000",
+        "MAX_PER_HOST": os.getenv("MAX_CONCURRENCY", "32"),
+        "BACKOFF_BASE_SECONDS": "0.05",
+    }.items():
+        os.environ.setdefault(name, value)
+
+    # 환경 변수를 정한 뒤에 import해야 설정이 반영됩니다.
+    from sqlalchemy import event
+    import crawler
+    import migrations
+    import models
+    from database import SessionLocal, engine
+    from metrics import CrawlStats
+
+    server = FixtureServer(
+        BoardConfig(
+            boards=args.boards,
+            pages=args.pages,
+            links_per_page=args.links,
+            latency_ms=args.latency_ms,
+            error_rate=args.error_rate,
+            etag=not args.no_etag,
+        )
+    ).start()
+
+    migrations.upgrade(engine)
+    with SessionLocal() as db:
+        for board in range(args.boards):
+            for n in range(args.tasks_per_board):
+                db.add(
+                    models.Task(
+                        url=server.board_url(board),
+                        keyword=KEYWORDS[n % len(KEYWORDS)],
+                        interval_minutes=0,  # 매 실행마다 체크 대상
+                    )
+                )
+        db.commit()
+        task_ids = [task_id for (task_id,) in db.query(models.Task.id).order_by(models.Task.id)]
+
+    queries = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*_):
+        nonlocal queries
+        queries += 1
+
+    # URL 그룹(또는 단일 작업) 단위 처리 시간을 잽니다.
+    latencies: list[float] = []
+    check_url = crawler.CrawlEngine.check_url
+
+    async def timed_check_url(self, group_url, tasks):
+        started = time.perf_counter()
+        try:
+            return await check_url(self, group_url, tasks)
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    crawler.CrawlEngine.check_url = timed_check_url
+    config = crawler.CrawlerConfig(timeout=30)
+
+    print(
+        f"boards={args.boards} pages={args.pages} links/page={args.links} "
+        f"tasks={len(task_ids)} latency={args.latency_ms}ms errors={args.error_rate:.0%} "
+        f"mode={args.mode}"
+    )
+    print(
+        f"{'run':>4}{'seconds':>9}{'requests':>10}{'304':>6}{'503':>6}{'pages/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}{'alerts':>8}{'rss MB':>8}{'child MB':>10}"
+    )
+    for run in range(1, args.runs + 1):
+        if run > 1:
+            for board in range(0, args.boards, 2):
+                server.publish(board, args.new_posts)
+        server.reset_counters()
+        latencies.clear()
+        queries = 0
+        stats = CrawlStats()
+
+        started = time.perf_counter()
+        if args.mode == "all":
+            crawler.check_all_tasks(config, stats=stats)
+        else:
+            for task_id in task_ids:
+                crawler.perform_check(task_id, config, stats=stats)
+        elapsed = time.perf_counter() - started
+
+        own_rss, child_rss = peak_rss_mb()
+        print(
+            f"{run:>4}{elapsed:>9.2f}{server.requests:>10}{server.not_modified:>6}"
+            f"{server.errors:>6}{stats.pages_fetched / elapsed:>9.1f}"
+            f"{percentile(latencies, 50) * 1000:>9.0f}{percentile(latencies, 95) * 1000:>9.0f}"
+            f"{queries:>9}{stats.alerts_found:>8}{own_rss:>8.0f}{child_rss:>10.0f}"
+        )
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
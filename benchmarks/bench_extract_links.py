@@ -0,0 +1,90 @@
+"""
+extract_links 벤치마크: lxml SAX 경로 vs 기존 BeautifulSoup(html.parser) 경로
+
+사용법:
+    python benchmarks/bench_extract_links.py [저장한_목록_페이지.html ...]
+
+파일을 주지 않으면 합성 게시판 목록 페이지와 test_page.html을 사용합니다.
+두 구현의 결과(순서, 중복 제거, 스킴 필터링)가 같은지도 함께 확인합니다.
+"""
+
+import os
+import sys
+import argparse
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from crawler import extract_links, extract_links_soup  # noqa: E402
+
+BASE_URL = "https://example.com/board/list?page=1"
+
+
+def synthetic_board(rows: int = 500) -> str:
+    """
+    공지/본문/댓글 링크와 잡다한 마크업이 섞인 큰 목록 페이지를 만듭니다.
+    """
+    parts = ["<html><head><title>board</title>"]
+    parts.append("<script>var a = '<a href=\"/fake\">';</script></head><body>")
+    parts.append('<div id="nav"><a href="#top">top</a> <a href="javascript:void(0)">js</a>')
+    parts.append('<a href="mailto:admin@example.com">mail</a></div><table>')
+    for i in range(rows):
+        parts.append(
+            f'<tr class="row"><td>{i}</td>'
+            f'<td><a href="/board/view?no={i}&amp;page=1" class="title">글 제목 {i}</a>'
+            f' <a href="/board/view?no={i}&comment_srl={i}#c">[{i % 7}]</a></td>'
+            f'<td><span>작성자{i}</span></td><td>2024-01-01</td>'
+            f'<td><img src="/i/{i}.png"></td></tr>'
+        )
+    parts.append("</table>")
+    parts.append(" ".join(f'<a href="?page={p}">{p}</a>' for p in range(1, 11)))
+    parts.append('<a href="https://other.example.org/ad">ad</a></body></html>')
+    return "".join(parts)
+
+
+def load_pages(paths: list[str]) -> list[tuple[str, str]]:
+    if not paths:
+        paths = [os.path.join(ROOT, "test_page.html")]
+        pages = [("synthetic-board", synthetic_board())]
+    else:
+        pages = []
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", help="saved list page HTML files")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("-n", "--number", type=int, default=50)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'page':<24}{'bytes':>10}{'links':>8}{'soup ms':>10}{'lxml ms':>10}{'speedup':>9}")
+    for name, html in load_pages(args.files):
+        expected = extract_links_soup(args.base_url, html)
+        actual = extract_links(args.base_url, html)
+        if actual != expected:
+            ok = False
+            print(f"MISMATCH on {name}: soup={len(expected)} lxml={len(actual)}")
+
+        soup_s = timeit.timeit(
+            lambda: extract_links_soup(args.base_url, html), number=args.number
+        )
+        lxml_s = timeit.timeit(
+            lambda: extract_links(args.base_url, html), number=args.number
+        )
+        soup_ms = soup_s / args.number * 1000
+        lxml_ms = lxml_s / args.number * 1000
+        print(
+            f"{name[:23]:<24}{len(html.encode()):>10}{len(actual):>8}"
+            f"{soup_ms:>10.2f}{lxml_ms:>10.2f}{soup_ms / lxml_ms:>8.1f}x"
+        )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
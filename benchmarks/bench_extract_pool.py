@@ -0,0 +1,95 @@
+"""
+본문 추출 처리량 벤치마크: 추출 프로세스 수(EXTRACT_WORKERS)별 pages/sec
+
+사용법:
+    python benchmarks/bench_extract_pool.py [저장한_상세_페이지.html ...] [--pages 200]
+
+파일을 주지 않으면 합성 게시글 페이지를 사용합니다. 0 워커(이벤트 루프 안에서 추출,
+기존 방식)부터 코어 수까지 늘려 가며 같은 페이지 묶음을 ExtractionQueue로 흘려보내고,
+처리량과 큐에 동시에 머문 본문의 최대 개수(backpressure 확인용)를 출력합니다.
+"""
+
+import os
+import sys
+import argparse
+import asyncio
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from extraction import ExtractionQueue, extract_page_text  # noqa: E402
+
+
+def synthetic_post(i: int, paragraphs: int = 80) -> bytes:
+    """
+    내비게이션/댓글/광고 블록에 둘러싸인 긴 게시글 페이지를 만듭니다.
+    """
+    parts = [f"<html><head><title>글 {i}</title></head><body>"]
+    parts.append("<nav>" + " ".join(f'<a href="/c/{c}">메뉴 {c}</a>' for c in range(40)) + "</nav>")
+    parts.append(f"<article><h1>게시글 제목 {i}</h1>")
+    for p in range(paragraphs):
+        parts.append(
+            f"<p>본문 {i}-{p}: 이 문단은 추출 성능을 재기 위한 긴 문장입니다. "
+            f"The quick brown fox jumps over the lazy dog {p}. 키워드 후보 단어들이 섞여 있습니다.</p>"
+        )
+    parts.append("</article><section class='comments'>")
+    for c in range(30):
+        parts.append(f"<div class='comment'><b>작성자{c}</b> 댓글 내용 {c}</div>")
+    parts.append("</section><footer>copyright</footer></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def load_pages(paths: list[str], count: int) -> list[bytes]:
+    if paths:
+        bodies = []
+        for path in paths:
+            with open(path, "rb") as f:
+                bodies.append(f.read())
+    else:
+        bodies = [synthetic_post(i) for i in range(16)]
+    return [bodies[i % len(bodies)] for i in range(count)]
+
+
+async def run(pages: list[bytes], workers: int) -> tuple[float, int]:
+    queue = ExtractionQueue(extract_page_text, workers=workers)
+    peak = 0
+
+    async def one(body: bytes):
+        nonlocal peak
+        if queue._queue is not None:
+            peak = max(peak, queue._queue.qsize())
+        await queue.extract(body, "utf-8")
+
+    # 워커 프로세스 기동 비용은 빼고 잼
+    await asyncio.gather(*(one(body) for body in pages[: max(workers, 1)]))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(body) for body in pages))
+    elapsed = time.perf_counter() - started
+    await queue.aclose()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", help="saved detail page HTML files")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pages = load_pages(args.files, args.pages)
+    counts = [0] + [n for n in (1, 2, 4, 8, 16, 32, 64) if n < args.max_workers]
+    counts.append(args.max_workers)
+
+    baseline = None
+    print(f"cores={os.cpu_count()} pages={len(pages)}")
+    print(f"{'workers':>8}{'seconds':>10}{'pages/s':>10}{'speedup':>9}{'queue peak':>12}")
+    for workers in dict.fromkeys(counts):
+        elapsed, peak = asyncio.run(run(pages, workers))
+        rate = len(pages) / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8}{elapsed:>10.2f}{rate:>10.1f}{rate / baseline:>8.1f}x{peak:>12}")
+
+
+if __name__ == "__main__":
+    main()
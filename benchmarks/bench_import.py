@@ -0,0 +1,81 @@
+"""
+main.py 콜드 스타트 벤치마크: `python -X importtime -c "import main"`
+
+사용법:
+    python benchmarks/bench_import.py [--runs 5] [--top 15] [--max-ms 1500]
+
+새 인터프리터에서 main을 여러 번 불러와 가장 빠른 실행의 누적 import 시간과
+오래 걸린 모듈을 출력합니다. 크롤링 모듈(crawler, httpx, bs4, lxml, trafilatura)이
+딸려 오거나 --max-ms를 넘으면 종료 코드 1로 끝나므로 CI에서 회귀 확인용으로 쓸 수 있습니다.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 대시보드 요청만 처리하는 콜드 스타트에서 불러오면 안 되는 모듈
+LAZY_MODULES = ("crawler", "extraction", "httpx", "bs4", "lxml", "trafilatura", "migrations")
+
+PROBE = (
+    "import sys; import main; "
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+)
+
+
+def import_once() -> tuple[list[tuple[int, int, str]], list[str]]:
+    """
+    (self us, cumulative us, 모듈) 목록과 불러온 지연 모듈 목록을 반환합니다.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    loaded = [name for name in proc.stdout.strip().split(",") if name]
+    return rows, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="main.py import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--max-ms", type=float, default=0, help="넘으면 실패 (0이면 검사 안 함)")
+    args = parser.parse_args()
+
+    best = None
+    loaded: list[str] = []
+    for _ in range(args.runs):
+        rows, loaded = import_once()
+        total = next(cumulative for _, cumulative, name in rows if name.strip() == "main")
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    print(f"import main: {total / 1000:.1f} ms (best of {args.runs})")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: -row[1])[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: crawl stack imported at startup: {', '.join(loaded)}")
+        failed = True
+    if args.max_ms and total / 1000 > args.max_ms:
+        print(f"FAIL: {total / 1000:.1f} ms > --max-ms {args.max_ms}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
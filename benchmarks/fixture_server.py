@@ -0,0 +1,196 @@
+"""
+벤치마크용 로컬 게시판 서버
+
+/board/<n>?page=<p> 는 최신 글부터 links_per_page개씩 상세 링크를 보여 주는 목록 페이지,
+/board/<n>/post/<id> 는 상세 페이지입니다. 응답 지연, 오류(503) 비율, ETag/304 지원을
+설정할 수 있고, publish()로 새 글을 올려 증분 크롤링 상황을 만들 수 있습니다.
+
+단독 실행:
+    python benchmarks/fixture_server.py --port 8800 --boards 5 --latency-ms 50
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+KEYWORDS = ["채용", "공지", "마감", "release", "security"]
+
+
+@dataclass
+class BoardConfig:
+    boards: int = 10
+    pages: int = 5
+    links_per_page: int = 20
+    latency_ms: float = 0
+    error_rate: float = 0.0
+    etag: bool = True
+    keyword_rate: float = 0.2
+    paragraphs: int = 30
+    seed: int = 1
+
+
+class FixtureServer:
+    def __init__(self, config: BoardConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        # 게시판별 가장 최신 글 번호 (글 번호는 1부터)
+        self.latest = {board: config.pages * config.links_per_page for board in range(config.boards)}
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def board_url(self, board: int) -> str:
+        return f"{self.base_url}/board/{board}"
+
+    def publish(self, board: int, count: int = 1):
+        with self.lock:
+            self.latest[board] += count
+
+    def reset_counters(self):
+        with self.lock:
+            self.requests = self.not_modified = self.errors = 0
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # --- pages ------------------------------------------------------------
+
+    def list_page(self, board: int, page: int) -> str:
+        cfg = self.config
+        newest = self.latest[board] - (page - 1) * cfg.links_per_page
+        ids = [i for i in range(newest, newest - cfg.links_per_page, -1) if i > 0]
+        rows = "".join(
+            f'<tr><td>{i}</td><td><a href="/board/{board}/post/{i}">글 {i}</a></td>'
+            f'<td>작성자{i % 13}</td></tr>'
+            for i in ids
+        )
+        pager = " ".join(f'<a href="?page={p}">{p}</a>' for p in range(1, cfg.pages + 1))
+        return (
+            f"<html><head><title>board {board}</title></head><body>"
+            f'<div id="nav"><a href="/">home</a> <a href="#top">top</a></div>'
+            f"<table>{rows}</table><div class='pager'>{pager}</div></body></html>"
+        )
+
+    def post_page(self, board: int, post: int) -> str:
+        cfg = self.config
+        # 같은 글은 항상 같은 본문이 나오도록 글 번호로 시드를 고정
+        rng = random.Random(board * 1_000_003 + post)
+        keyword = rng.choice(KEYWORDS) if rng.random() < cfg.keyword_rate else "일반"
+        body = "".join(
+            f"<p>게시판 {board} 글 {post}의 {n}번째 문단입니다. 평범한 내용이 이어집니다.</p>"
+            for n in range(cfg.paragraphs)
+        )
+        return (
+            f"<html><head><title>글 {post}</title></head><body>"
+            f"<nav><a href='/board/{board}'>목록</a></nav>"
+            f"<article><h1>{board}-{post} 제목</h1><p>말머리: {keyword}</p>{body}</article>"
+            f"<footer>footer</footer></body></html>"
+        )
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                cfg = server.config
+                with server.lock:
+                    server.requests += 1
+                    fail = server.rng.random() < cfg.error_rate
+                if cfg.latency_ms:
+                    time.sleep(cfg.latency_ms / 1000)
+                parts = urlsplit(self.path)
+                segments = [seg for seg in parts.path.split("/") if seg]
+                query = dict(parse_qsl(parts.query))
+                if fail and parts.path != "/robots.txt":
+                    with server.lock:
+                        server.errors += 1
+                    return self._send(503, b"", {"Retry-After": "0"})
+                try:
+                    if not segments:
+                        body = "<html><body><h1>fixture boards</h1></body></html>"
+                    elif len(segments) == 2 and segments[0] == "board":
+                        body = server.list_page(int(segments[1]), int(query.get("page", 1)))
+                    elif len(segments) == 4 and segments[0] == "board" and segments[2] == "post":
+                        body = server.post_page(int(segments[1]), int(segments[3]))
+                    else:
+                        return self._send(404, b"")
+                except ValueError:
+                    return self._send(404, b"")
+
+                payload = body.encode("utf-8")
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if cfg.etag:
+                    etag = '"%s"' % hashlib.md5(payload).hexdigest()
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        with server.lock:
+                            server.not_modified += 1
+                        return self._send(304, b"", headers)
+                self._send(200, payload, headers)
+
+            def _send(self, status: int, payload: bytes, headers: Optional[dict] = None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if payload:
+                    self.wfile.write(payload)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic paginated boards")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--links", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-etag", action="store_true")
+    args = parser.parse_args()
+    config = BoardConfig(
+        boards=args.boards,
+        pages=args.pages,
+        links_per_page=args.links,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        etag=not args.no_etag,
+    )
+    server = FixtureServer(config, port=args.port)
+    print(f"serving {config.boards} boards at {server.base_url}/board/<n>")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1467 @@
+"""
+main.py(FastAPI)와 cron_job.py가 함께 사용하는 크롤링 엔진
+
+fetcher(다운로드) -> parser(링크/본문 추출) -> matcher(키워드 검색) 단계로 구성되며,
+각 단계는 CrawlEngine 생성 시 교체할 수 있습니다.
+"""
+
+import os
+import asyncio
+import bisect
+import codecs
+import hashlib
+import logging
+import re
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from urllib.parse import (
+    urljoin,
+    urlparse,
+    urlsplit,
+    urlunsplit,
+    parse_qsl,
+    urlencode,
+)
+import httpx
+from bs4 import BeautifulSoup
+from lxml import etree
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import SessionLocal
+from archive import PageArchive, default_archive
+from extraction import EXTRACT_WORKERS, ExtractionQueue, extract_page_text
+from feeds import FeedEntry, discover_feed_urls, parse_feed
+from metrics import CrawlStats, current_task_ids
+from politeness import MAX_RETRIES, RETRY_STATUS, HostScheduler
+from seen_index import SeenIndex
+from work_queue import (
+    WorkerShard,
+    default_worker_id,
+    lease_due_tasks,
+    next_interval,
+    release_leases,
+)
+import models
+
+logger = logging.getLogger(__name__)
+
+MAX_DETAIL_LINKS = int(os.getenv("MAX_DETAIL_LINKS", "30"))
+MAX_PAGES = int(os.getenv("MAX_PAGES", "5"))
+PAGE_PARAM = os.getenv("PAGE_PARAM", "page")
+ALLOW_PATH_REGEX = os.getenv("ALLOW_PATH_REGEX", "")
+DENY_PATH_REGEX = os.getenv("DENY_PATH_REGEX", "")
+# 전체 동시 요청 수 / 호스트별 동시 요청 수
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "32"))
+MAX_PER_HOST = int(os.getenv("MAX_PER_HOST", "4"))
+# 상세 페이지 결과를 이 개수(TaskLink 행)만큼 모이면 중간 커밋
+COMMIT_BATCH_SIZE = int(os.getenv("COMMIT_BATCH_SIZE", "10"))
+# 작업별 seen 인덱스 최대 크기와 task_links 보관 기간(일)
+SEEN_INDEX_MAX_ENTRIES = int(os.getenv("SEEN_INDEX_MAX_ENTRIES", "20000"))
+TASK_LINK_RETENTION_DAYS = int(os.getenv("TASK_LINK_RETENTION_DAYS", "30"))
+# 글 목록이 없는 페이지에서 기억할 본문 블록(문단) 해시 최대 개수
+BLOCK_FINGERPRINT_MAX_ENTRIES = int(os.getenv("BLOCK_FINGERPRINT_MAX_ENTRIES", "5000"))
+# 응답 본문 최대 크기(압축 해제 후). 넘는 부분은 받지 않고 잘라 냅니다. (0이면 제한 없음)
+MAX_BODY_BYTES = int(os.getenv("MAX_BODY_BYTES", str(5 * 1024 * 1024)))
+# 목록 페이지의 피드 링크를 다시 찾아보는 주기 (0이면 피드를 쓰지 않음)
+FEED_DISCOVERY_DAYS = int(os.getenv("FEED_DISCOVERY_DAYS", "7"))
+# 피드 항목 중 이 비율 이상이 목록 1페이지에도 있어야 이 게시판의 피드로 봅니다. (사이트 전체 피드 제외)
+FEED_MIN_OVERLAP = float(os.getenv("FEED_MIN_OVERLAP", "0.5"))
+FEED_MAX_CANDIDATES = 3
+# 헤더/문서에 문자셋 선언이 없고 UTF-8로도 읽히지 않는 페이지의 인코딩
+FALLBACK_ENCODING = os.getenv("FALLBACK_ENCODING", "cp949")
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    )
+}
+
+
+@dataclass
+class CrawlerConfig:
+    timeout: float = 30
+    max_pages: int = MAX_PAGES
+    max_detail_links: int = MAX_DETAIL_LINKS
+    max_concurrency: int = MAX_CONCURRENCY
+    max_per_host: int = MAX_PER_HOST
+    extract_workers: int = EXTRACT_WORKERS
+    max_body_bytes: int = MAX_BODY_BYTES
+    headers: dict = field(default_factory=lambda: dict(HEADERS))
+
+
+# --- parser ---------------------------------------------------------------
+
+
+class _HrefCollector:
+    """
+    lxml 파서 target: DOM을 만들지 않고 <a href> 값만 순서대로 모읍니다.
+    """
+
+    def __init__(self):
+        self.hrefs: list[str] = []
+
+    def start(self, tag, attrib):
+        if tag == "a":
+            href = attrib.get("href")
+            if href is not None:
+                self.hrefs.append(href)
+
+    def end(self, tag):
+        pass
+
+    def data(self, data):
+        pass
+
+    def close(self) -> list[str]:
+        return self.hrefs
+
+
+def extract_links(base_url: str, html: str) -> list[str]:
+    """
+    libxml2 SAX 방식으로 링크를 뽑습니다. 파싱에 실패하면 BeautifulSoup 경로로 대체합니다.
+    """
+    if not html:
+        return []
+    parser = etree.HTMLParser(target=_HrefCollector())
+    try:
+        parser.feed(html)
+        hrefs = parser.close()
+    except etree.LxmlError:
+        return extract_links_soup(base_url, html)
+    return _absolute_links(base_url, hrefs)
+
+
+def extract_links_soup(base_url: str, html: str) -> list[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    return _absolute_links(
+        base_url, [tag["href"] for tag in soup.find_all("a", href=True)]
+    )
+
+
+def _absolute_links(base_url: str, hrefs: list[str]) -> list[str]:
+    links: list[str] = []
+    seen: set[str] = set()
+    for href in hrefs:
+        href = href.strip()
+        if not href or href.startswith("#"):
+            continue
+        if href.startswith(("javascript:", "mailto:")):
+            continue
+        absolute = urljoin(base_url, href)
+        if not absolute.startswith(("http://", "https://")):
+            continue
+        if absolute in seen:
+            continue
+        seen.add(absolute)
+        links.append(absolute)
+    return links
+
+
+def is_same_domain(base_url: str, target_url: str) -> bool:
+    try:
+        return urlparse(base_url).netloc == urlparse(target_url).netloc
+    except Exception:
+        return False
+
+
+def build_paged_url(url: str, page: int) -> str:
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    query[PAGE_PARAM] = str(page)
+    new_query = urlencode(query)
+    return urlunsplit(
+        (parts.scheme, parts.netloc, parts.path, new_query, parts.fragment)
+    )
+
+
+def normalize_detail_url(url: str) -> str:
+    parts = urlsplit(url)
+    query_pairs = [(k, v) for k, v in parse_qsl(parts.query) if k != "comment_srl"]
+    new_query = urlencode(query_pairs)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, ""))
+
+
+def should_follow_link(url: str) -> bool:
+    path = urlsplit(url).path
+    if DENY_PATH_REGEX and re.search(DENY_PATH_REGEX, path):
+        return False
+    if ALLOW_PATH_REGEX:
+        return re.search(ALLOW_PATH_REGEX, path) is not None
+    return True
+
+
+def text_blocks(text: str) -> list[tuple[int, str]]:
+    """
+    추출한 본문을 문단(줄) 단위로 나눠 (본문 내 시작 위치, 문단) 목록을 반환합니다.
+    """
+    blocks = []
+    offset = 0
+    for line in text.split("\n"):
+        if line.strip():
+            blocks.append((offset, line))
+        offset += len(line) + 1
+    return blocks
+
+
+def block_key(block: str) -> str:
+    # 공백 차이만 있는 문단은 같은 문단으로 봅니다.
+    return " ".join(block.split())
+
+
+# --- matcher --------------------------------------------------------------
+
+
+class KeywordMatcher:
+    """
+    여러 키워드를 본문 한 번 훑기로 찾습니다.
+
+    키워드들을 트라이 모양의 정규식으로 컴파일해 각 위치에서 가장 긴 키워드를 찾고,
+    그 키워드의 접두사인 다른 키워드도 같은 위치에서 매칭된 것으로 처리합니다.
+    (Aho-Corasick과 같은 결과를 C 정규식 엔진 속도로 얻기 위함)
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(keywords))
+        non_empty = [kw for kw in self.keywords if kw]
+        self._prefixes = {
+            kw: [other for other in non_empty if kw.startswith(other)]
+            for kw in non_empty
+        }
+        self._pattern = (
+            re.compile(f"(?=({_trie_pattern(non_empty)}))") if non_empty else None
+        )
+
+    def find_all(self, text: str) -> dict[str, int]:
+        """
+        키워드별 첫 등장 위치를 반환합니다. (str.find와 같은 위치)
+        """
+        found: dict[str, int] = {}
+        if "" in self.keywords:
+            found[""] = 0
+        if self._pattern is None:
+            return found
+        remaining = len(self._prefixes)
+        for match in self._pattern.finditer(text):
+            for kw in self._prefixes[match.group(1)]:
+                if kw not in found:
+                    found[kw] = match.start()
+                    remaining -= 1
+            if remaining == 0:
+                break
+        return found
+
+    def find(self, text: str, keyword: str) -> int:
+        return self.find_all(text).get(keyword, -1)
+
+    @staticmethod
+    def snippet(text: str, idx: int, radius: int = 50) -> str:
+        start = max(0, idx - radius)
+        end = min(len(text), idx + radius)
+        return text[start:end].replace("\n", " ").strip()
+
+
+def _trie_pattern(keywords: list[str]) -> str:
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alternatives = [
+            re.escape(ch) + build(child) for ch, child in node.items() if ch != ""
+        ]
+        if not alternatives:
+            return ""
+        body = "|".join(alternatives)
+        if "" in node:
+            # 더 긴 키워드를 먼저 시도하고, 실패하면 여기서 끝나는 키워드로 매칭
+            return f"(?:{body})?"
+        return body if len(alternatives) == 1 else f"(?:{body})"
+
+    return build(trie)
+
+
+# --- fetcher --------------------------------------------------------------
+
+
+@dataclass
+class ListPage:
+    """
+    조건부 요청으로 받은 목록 페이지와 다음 요청에 쓸 검증자
+
+    content/encoding은 글 목록이 없는 페이지의 본문 추출에 다시 씁니다. (같은 URL을 또 받지 않음)
+    """
+
+    html: str = ""
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    content: bytes = b""
+    encoding: Optional[str] = None
+
+
+# 문서 앞부분의 <meta charset="..."> / <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_:.-]+)""", re.I)
+_SNIFF_BYTES = 4096
+# EUC-KR로 선언해도 CP949 확장 글자를 쓰는 사이트가 많으므로 상위 집합으로 읽습니다.
+_CHARSET_ALIASES = {
+    "euc-kr": "cp949",
+    "euc_kr": "cp949",
+    "ks_c_5601-1987": "cp949",
+    "ksc5601": "cp949",
+    "x-windows-949": "cp949",
+}
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def _lookup_charset(name: str) -> Optional[str]:
+    name = name.strip().strip("'\"").lower()
+    try:
+        return codecs.lookup(_CHARSET_ALIASES.get(name, name)).name
+    except LookupError:
+        return None
+
+
+def sniff_encoding(content_type: Optional[str], content: bytes) -> str:
+    """
+    BOM -> Content-Type 헤더 -> 문서 앞 4KB의 <meta charset> 순으로 인코딩을 정합니다.
+    (BOM은 헤더보다 우선합니다. WHATWG Encoding 표준의 BOM sniffing과 같은 순서)
+    선언이 없으면 UTF-8로 읽히는지만 확인하고, 아니면 FALLBACK_ENCODING을 씁니다.
+    (본문 전체를 통계로 훑는 문자셋 감지는 하지 않습니다)
+    """
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            encoding = _lookup_charset(value)
+            if encoding:
+                return encoding
+    match = _META_CHARSET.search(content[:_SNIFF_BYTES])
+    if match:
+        encoding = _lookup_charset(match.group(1).decode("ascii"))
+        if encoding:
+            return encoding
+    try:
+        # 잘린 본문의 끝에 걸친 글자는 오류로 보지 않음 (final=False)
+        codecs.getincrementaldecoder("utf-8")().decode(content, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def is_text_response(content_type: Optional[str]) -> bool:
+    """
+    Content-Type이 없거나 HTML/XML/텍스트면 True (이미지, PDF, 압축 파일 등은 내려받지 않음)
+    """
+    if not content_type:
+        return True
+    mime = content_type.split(";", 1)[0].strip().lower()
+    return mime.startswith("text/") or "html" in mime or "xml" in mime
+
+
+@dataclass
+class Download:
+    """
+    스트리밍으로 받은 응답. 본문은 max_body_bytes까지만 읽습니다.
+    """
+
+    # 이미 닫힌 스트림 응답 (상태 코드와 헤더만 사용)
+    response: httpx.Response
+    content: bytes = b""
+    truncated: bool = False
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self.response.headers
+
+    @cached_property
+    def encoding(self) -> str:
+        return sniff_encoding(self.headers.get("Content-Type"), self.content)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class CrawlLimiter:
+    """
+    전역 동시 요청 수와 호스트별 동시 요청 수를 함께 제한합니다.
+    """
+
+    def __init__(self, max_concurrency: int, max_per_host: int):
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._max_per_host = max_per_host
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc
+        host_sem = self._hosts.get(host)
+        if host_sem is None:
+            host_sem = self._hosts[host] = asyncio.Semaphore(self._max_per_host)
+        # 호스트 슬롯을 먼저 잡아야 다른 호스트의 전역 슬롯을 막지 않습니다.
+        async with host_sem:
+            async with self._global:
+                yield
+
+
+class Fetcher:
+    """
+    실행 단위로 공유하는 keep-alive 커넥션 풀 위에서 페이지를 내려받습니다.
+    """
+
+    def __init__(
+        self,
+        config: CrawlerConfig,
+        text_extractor: Callable[[bytes, Optional[str]], Optional[str]] = extract_page_text,
+        stats: Optional[CrawlStats] = None,
+    ):
+        self.config = config
+        # 본문 추출은 프로세스 풀에서 (text_extractor는 pickle 가능한 모듈 함수여야 함)
+        self.extraction = ExtractionQueue(
+            text_extractor, workers=config.extract_workers, in_flight=config.max_concurrency
+        )
+        self.stats = stats or CrawlStats()
+        self.limiter = CrawlLimiter(config.max_concurrency, config.max_per_host)
+        limits = httpx.Limits(
+            max_connections=config.max_concurrency,
+            max_keepalive_connections=config.max_concurrency,
+        )
+        self.client = httpx.AsyncClient(
+            headers=config.headers,
+            timeout=config.timeout,
+            limits=limits,
+            follow_redirects=True,
+        )
+        self.scheduler = HostScheduler(self.client)
+
+    async def aclose(self):
+        await self.extraction.aclose()
+        await self.client.aclose()
+
+    async def _get(self, url: str, headers: Optional[dict]) -> Download:
+        """
+        본문을 스트리밍으로 읽어 max_body_bytes에서 멈춥니다. 성공 응답이 아니거나
+        텍스트가 아닌 응답은 본문을 읽지 않습니다.
+        """
+        limit = self.config.max_body_bytes
+        async with self.client.stream("GET", url, headers=headers) as response:
+            if not response.is_success:
+                return Download(response)
+            content_type = response.headers.get("Content-Type")
+            if not is_text_response(content_type):
+                logger.info(f"Skipping non-text response ({content_type}): {url}")
+                return Download(response)
+            chunks: list[bytes] = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                if limit and size + len(chunk) > limit:
+                    chunks.append(chunk[: limit - size])
+                    logger.warning(f"Response body over {limit} bytes, truncated: {url}")
+                    return Download(response, b"".join(chunks), truncated=True)
+                chunks.append(chunk)
+                size += len(chunk)
+        return Download(response, b"".join(chunks))
+
+    async def download(
+        self, url: str, kind: str, headers: Optional[dict] = None
+    ) -> Optional[Download]:
+        """
+        URL을 한 번만 내려받아 응답을 돌려줍니다. 403이면 None을 반환합니다.
+
+        403/429/5xx는 호스트별 백오프 후 MAX_RETRIES번까지 다시 시도합니다.
+        """
+        host_stats = self.stats.host(urlparse(url).netloc)
+        for attempt in range(MAX_RETRIES + 1):
+            await self.scheduler.acquire(url)
+            async with self.limiter.slot(url):
+                download = await self._get(url, headers)
+            self.stats.pages_fetched += 1
+            self.stats.bytes_downloaded += len(download.content)
+            host_stats.requests += 1
+            host_stats.bytes += len(download.content)
+            if download.status_code in RETRY_STATUS:
+                host_stats.errors += 1
+            if download.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+                break
+            self.scheduler.backoff(url, download.response, attempt)
+        if download.status_code == 403:
+            logger.warning(f"403 Forbidden for {kind} page: {url}")
+            return None
+        if download.status_code == 304:
+            return download
+        download.response.raise_for_status()
+        return download
+
+    async def fetch_html(self, url: str) -> str:
+        with self.stats.timer("list_fetch", urlparse(url).netloc):
+            download = await self.download(url, "list")
+        return download.text if download is not None else ""
+
+    async def fetch_list_page(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> ListPage:
+        """
+        If-None-Match / If-Modified-Since를 붙여 목록 페이지를 요청합니다.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        with self.stats.timer("list_fetch", urlparse(url).netloc):
+            download = await self.download(url, "list", headers=headers or None)
+        if download is None:
+            return ListPage()
+        if download.status_code == 304:
+            return ListPage(not_modified=True)
+        return ListPage(
+            html=download.text,
+            etag=download.headers.get("ETag"),
+            last_modified=download.headers.get("Last-Modified"),
+            content_hash=hashlib.sha256(download.content).hexdigest(),
+            content=download.content,
+            encoding=download.encoding,
+        )
+
+    async def extract_text(
+        self, url: str, content: bytes, encoding: Optional[str]
+    ) -> Optional[str]:
+        with self.stats.timer("extract", urlparse(url).netloc):
+            return await self.extraction.extract(content, encoding)
+
+    async def fetch_text(self, url: str) -> Optional[str]:
+        # 추출 자리를 먼저 잡아야 추출을 기다리는 본문이 메모리에 무한정 쌓이지 않습니다.
+        async with self.extraction.reserve():
+            with self.stats.timer("detail_fetch", urlparse(url).netloc):
+                download = await self.download(url, "detail")
+            if download is None or not download.content:
+                return None
+            return await self.extract_text(url, download.content, download.encoding)
+
+
+# --- engine ---------------------------------------------------------------
+
+
+@dataclass
+class TaskSnapshot:
+    """
+    네트워크 대기 중에 세션을 붙잡지 않도록 복사해 둔 작업 정보
+    """
+
+    id: int
+    url: str
+    keyword: str
+    last_checked: Optional[datetime]
+    seen: SeenIndex
+    high_water_url: Optional[str] = None
+    # 지난 체크 때 페이지 본문 블록 해시 (글 목록이 없는 페이지용)
+    block_fingerprint: Optional[bytes] = None
+    # 적응형 체크 간격 (work_queue.next_interval)
+    interval_minutes: int = 0
+    min_interval_minutes: Optional[int] = None
+    max_interval_minutes: Optional[int] = None
+    current_interval_minutes: Optional[float] = None
+    # 발견해 둔 피드 (feeds.py)
+    feed_url: Optional[str] = None
+    feed_checked_at: Optional[datetime] = None
+
+
+def load_task_snapshots(task_ids: list[int]) -> list[TaskSnapshot]:
+    with SessionLocal() as db:
+        tasks = (
+            db.query(models.Task)
+            .filter(models.Task.id.in_(task_ids))
+            .filter(models.Task.is_active == True)
+            .all()
+        )
+        # 인덱스가 아직 없는 작업은 기존 task_links로 한 번 만들어 둡니다.
+        legacy_ids = [task.id for task in tasks if task.seen_index is None]
+        legacy_urls: dict[int, list[str]] = {}
+        if legacy_ids:
+            for task_id, url in (
+                db.query(models.TaskLink.task_id, models.TaskLink.url)
+                .filter(models.TaskLink.task_id.in_(legacy_ids))
+                .order_by(models.TaskLink.id)
+            ):
+                legacy_urls.setdefault(task_id, []).append(url)
+
+        snapshots = []
+        for task in tasks:
+            if task.seen_index is None:
+                seen = SeenIndex.from_urls(legacy_urls.get(task.id, []))
+                seen.dirty = True
+            else:
+                seen = SeenIndex(task.seen_index)
+            snapshots.append(
+                TaskSnapshot(
+                    task.id,
+                    task.url,
+                    task.keyword,
+                    task.last_checked,
+                    seen,
+                    high_water_url=task.high_water_url,
+                    block_fingerprint=task.block_fingerprint,
+                    interval_minutes=task.interval_minutes or 0,
+                    min_interval_minutes=task.min_interval_minutes,
+                    max_interval_minutes=task.max_interval_minutes,
+                    current_interval_minutes=task.current_interval_minutes,
+                    feed_url=task.feed_url,
+                    feed_checked_at=task.feed_checked_at,
+                )
+            )
+        return snapshots
+
+
+
+class CrawlEngine:
+    """
+    URL 단위 크롤링 파이프라인.
+
+    같은 URL을 보는 작업들은 한 번만 크롤링하고, 가져온 페이지마다 모든 키워드를
+    한 번에 검색합니다. DB 작업은 네트워크 대기 사이의 짧은 세션에서만 수행하므로,
+    많은 URL을 동시에 돌려도 커넥션 풀을 오래 붙잡지 않습니다.
+    """
+
+    def __init__(
+        self,
+        config: Optional[CrawlerConfig] = None,
+        fetcher: Optional[Fetcher] = None,
+        link_extractor: Callable[[str, str], list[str]] = extract_links,
+        matcher_factory: Callable[[Iterable[str]], KeywordMatcher] = KeywordMatcher,
+        stats: Optional[CrawlStats] = None,
+        archive: Optional[PageArchive] = None,
+    ):
+        self.config = config or CrawlerConfig()
+        self.stats = stats or CrawlStats()
+        self.archive = archive or default_archive()
+        self.fetcher = fetcher or Fetcher(self.config, stats=self.stats)
+        self.link_extractor = link_extractor
+        self.matcher_factory = matcher_factory
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.fetcher.aclose()
+
+    async def _collect_candidate_links(
+        self,
+        tasks: list[TaskSnapshot],
+        group_url: str,
+        first_page_html: str,
+        resume: bool = False,
+    ) -> tuple[list[str], dict[int, set[str]], dict[int, str], bool]:
+        """
+        목록 페이지를 넘기며 아직 처리하지 않은 링크를 모읍니다.
+
+        지난 실행의 high-water mark(1페이지에서 가장 최신이던 새 글)가 보이고 그 아래에
+        새 링크가 없으면, 그 뒤는 이미 본 글이므로 다음 페이지를 가져오지 않습니다.
+        mark가 안 보이면 그 사이에 새 글이 밀려난 것이므로 계속 넘깁니다.
+        (고정 공지가 mark가 된 경우에는 그 아래에 새 글이 보이므로 역시 계속 넘깁니다)
+
+        resume=True: 지난 실행이 max_detail_links에서 멈췄으므로 새 링크가 없는 페이지도
+        건너뛰고 다음 페이지로 넘어가 남은 글을 이어서 모읍니다.
+
+        반환값: (상세 페이지 후보 목록, 작업별로 새로운 링크 집합, 작업별 새 high-water mark,
+        남은 새 글 없이 끝까지 모았는지)
+        """
+        max_detail_links = self.config.max_detail_links
+        host = urlparse(group_url).netloc
+        candidate_links: list[str] = []
+        new_by_task: dict[int, set[str]] = {task.id: set() for task in tasks}
+        high_water: dict[int, str] = {}
+        reached: set[int] = set()
+        seen_links: set[str] = set()
+        for page in range(1, self.config.max_pages + 1):
+            if page == 1:
+                page_url = group_url
+                list_html = first_page_html
+            else:
+                page_url = build_paged_url(group_url, page)
+                list_html = await self.fetcher.fetch_html(page_url)
+            with self.stats.timer("link_extract", host):
+                links = self.link_extractor(page_url, list_html)
+                same_domain_links = [
+                    link for link in links if is_same_domain(group_url, link)
+                ]
+                normalized_links: list[str] = []
+                for link in same_domain_links:
+                    normalized = normalize_detail_url(link)
+                    if not should_follow_link(normalized):
+                        continue
+                    normalized_links.append(normalized)
+            with self.stats.timer("dedup", host):
+                # DB 대신 실행 시작 시 읽어 둔 seen 인덱스로 판단합니다.
+                new_links_page = [
+                    link
+                    for link in normalized_links
+                    if any(link not in task.seen for task in tasks)
+                ]
+                if page == 1:
+                    for task in tasks:
+                        first_new = next(
+                            (link for link in normalized_links if link not in task.seen),
+                            None,
+                        )
+                        if first_new:
+                            high_water[task.id] = first_new
+                for task in tasks:
+                    if task.id in reached or task.high_water_url not in normalized_links:
+                        continue
+                    below = normalized_links[normalized_links.index(task.high_water_url) + 1 :]
+                    if all(link in task.seen for link in below):
+                        reached.add(task.id)
+            self.stats.links_seen += len(normalized_links) - len(new_links_page)
+            self.stats.links_new += len(new_links_page)
+
+            if not new_links_page:
+                if resume:
+                    continue
+                # No new links on this page -> older pages are likely already processed.
+                break
+
+            for link in new_links_page:
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
+                candidate_links.append(link)
+                for task in tasks:
+                    if link not in task.seen:
+                        new_by_task[task.id].add(link)
+                if len(candidate_links) >= max_detail_links:
+                    break
+            if len(candidate_links) >= max_detail_links:
+                # 이 페이지나 뒤 페이지에 못 본 글이 남아 있을 수 있음
+                return candidate_links, new_by_task, high_water, False
+            if len(reached) == len(tasks) and not resume:
+                # 모든 작업이 지난번 최신 글까지 도달 -> 다음 페이지는 이미 본 내용
+                break
+        return candidate_links, new_by_task, high_water, True
+
+    def _feed_candidates(
+        self, tasks: list[TaskSnapshot], group_url: str, entries: list[FeedEntry]
+    ) -> tuple[list[str], dict[int, set[str]], dict[str, str], bool]:
+        """
+        피드 항목에서 아직 처리하지 않은 링크를 모읍니다. 목록 페이지를 넘기지 않습니다.
+
+        피드는 최신 글 순서이므로 작업마다 이미 본 항목을 만나면 그보다 오래된 항목은 보지 않습니다.
+        (사이트맵처럼 게시판 전체 글이 실린 피드에서 지난 글을 새 글로 알리지 않도록)
+        max_detail_links보다 많으면 이미 본 글에 가까운 오래된 쪽부터 처리하고 나머지는
+        다음 실행에서 이어서 처리합니다.
+
+        반환값: (상세 페이지 후보 목록, 작업별로 새로운 링크 집합, 피드에 실린 본문,
+        후보를 모두 처리했는지)
+        """
+        host = urlparse(group_url).netloc
+        pending: list[tuple[str, Optional[str], list[TaskSnapshot]]] = []
+        visited: set[str] = set()
+        reached: set[int] = set()
+        with self.stats.timer("dedup", host):
+            for entry in entries:
+                if not is_same_domain(group_url, entry.url):
+                    continue
+                link = normalize_detail_url(entry.url)
+                if not should_follow_link(link) or link in visited:
+                    continue
+                visited.add(link)
+                for task in tasks:
+                    if link in task.seen:
+                        reached.add(task.id)
+                if len(reached) == len(tasks):
+                    # 모든 작업이 이미 본 글까지 도달 -> 뒤는 지난 글
+                    self.stats.links_seen += 1
+                    break
+                owners = [task for task in tasks if task.id not in reached]
+                if not owners:
+                    self.stats.links_seen += 1
+                    continue
+                pending.append((link, entry.text, owners))
+
+        drained = len(pending) <= self.config.max_detail_links
+        candidate_links: list[str] = []
+        new_by_task: dict[int, set[str]] = {task.id: set() for task in tasks}
+        feed_texts: dict[str, str] = {}
+        for link, text, owners in pending[max(len(pending) - self.config.max_detail_links, 0) :]:
+            self.stats.links_new += 1
+            candidate_links.append(link)
+            if text:
+                feed_texts[link] = text
+            for task in owners:
+                new_by_task[task.id].add(link)
+        return candidate_links, new_by_task, feed_texts, drained
+
+    def _feed_gap(
+        self, tasks: list[TaskSnapshot], group_url: str, entries: list[FeedEntry]
+    ) -> bool:
+        """
+        피드 항목 중 이미 본 글이 하나도 없는 작업이 있으면 True를 반환합니다.
+        지난 체크 이후 피드 길이보다 많은 글이 올라와 피드만으로는 사이의 글을 놓치는 경우입니다.
+        (처음 체크하는 작업도 여기에 해당하므로 목록 페이지로 처음부터 크롤링합니다)
+        """
+        links = [
+            normalize_detail_url(entry.url)
+            for entry in entries
+            if is_same_domain(group_url, entry.url)
+        ]
+        if not links:
+            return False
+        return any(not any(link in task.seen for link in links) for task in tasks)
+
+    async def _discover_feed(self, group_url: str, list_html: str) -> Optional[str]:
+        """
+        목록 페이지가 알려 주는 피드 중 이 게시판의 글을 담은 것을 찾습니다.
+
+        사이트 전체 피드나 사이트맵은 다른 게시판 글이 섞이므로, 피드 항목이 목록 1페이지의
+        링크와 FEED_MIN_OVERLAP 이상 겹칠 때만 씁니다.
+        """
+        page_links = {
+            normalize_detail_url(link)
+            for link in self.link_extractor(group_url, list_html)
+            if is_same_domain(group_url, link)
+        }
+        for feed_url in discover_feed_urls(group_url, list_html)[:FEED_MAX_CANDIDATES]:
+            try:
+                with self.stats.timer("list_fetch", urlparse(feed_url).netloc):
+                    download = await self.fetcher.download(feed_url, "feed")
+            except httpx.HTTPError as e:
+                logger.info(f"Feed candidate failed {feed_url}: {e}")
+                continue
+            entries = parse_feed(feed_url, download.content) if download else None
+            if not entries:
+                continue
+            links = [
+                normalize_detail_url(entry.url)
+                for entry in entries[: max(len(page_links), 1)]
+                if is_same_domain(group_url, entry.url)
+            ]
+            overlap = sum(1 for link in links if link in page_links)
+            if links and overlap >= FEED_MIN_OVERLAP * len(links):
+                logger.info(f"Using feed {feed_url} for {group_url} ({overlap}/{len(links)} on list page)")
+                return feed_url
+        return None
+
+    async def check_url(
+        self, group_url: str, tasks: list[TaskSnapshot]
+    ) -> dict[int, bool]:
+        """
+        같은 URL을 보는 작업들을 한 번에 체크하고, 작업별 키워드 발견 여부를 반환합니다.
+        """
+        results = {task.id: False for task in tasks}
+        now = datetime.utcnow()
+        # 피드를 찾아 둔 게시판은 목록 페이지 대신 피드를 받습니다. (검증자도 피드 URL 기준)
+        feed_url = None
+        if FEED_DISCOVERY_DAYS > 0:
+            feed_url = next(
+                (
+                    task.feed_url
+                    for task in tasks
+                    if task.feed_url
+                    and task.feed_checked_at
+                    and now - task.feed_checked_at < timedelta(days=FEED_DISCOVERY_DAYS)
+                ),
+                None,
+            )
+        source_url = feed_url or group_url
+        with SessionLocal() as db:
+            validator = (
+                db.query(models.PageValidator)
+                .filter(models.PageValidator.url == source_url)
+                .first()
+            )
+            # 지난 실행이 후보 수 제한에서 멈췄으면 남은 글을 이어서 처리합니다.
+            resume = validator is not None and validator.drained is False
+            # 검증자는 모든 작업이 이미 처리한 본문을 가리킬 때만 사용합니다.
+            # (새로 추가된 작업이나 지난 실행이 실패한 작업이 있으면 전체 크롤링)
+            if validator is not None and (
+                resume
+                or any(
+                    task.last_checked is None or task.last_checked < validator.changed_at
+                    for task in tasks
+                )
+            ):
+                validator = None
+            cached = (
+                (validator.etag, validator.last_modified, validator.content_hash)
+                if validator
+                else (None, None, None)
+            )
+
+        task_ids = [task.id for task in tasks]
+        host = urlparse(group_url).netloc
+        task_label = ", ".join(str(task_id) for task_id in task_ids)
+        logger.info(
+            f"Checking Task {task_label}: {group_url} for "
+            + ", ".join(f"'{task.keyword}'" for task in tasks)
+        )
+        matcher = self.matcher_factory(task.keyword for task in tasks)
+
+        try:
+            feed_failed = False
+            try:
+                first_page = await self.fetcher.fetch_list_page(source_url, *cached[:2])
+            except httpx.HTTPError as e:
+                # 피드 요청 실패(404/410, 재시도 후에도 5xx, 연결 오류)는 아래에서
+                # 깨진 피드처럼 목록 페이지로 대신합니다.
+                if not feed_url:
+                    raise
+                logger.warning(f"Feed request failed for Task {task_label}: {e}")
+                feed_failed = True
+            self.stats.list_requests += 1
+            if feed_url:
+                self.stats.feed_requests += 1
+            if not feed_failed and (
+                first_page.not_modified
+                or (cached[2] is not None and first_page.content_hash == cached[2])
+            ):
+                if first_page.not_modified:
+                    self.stats.list_not_modified += 1
+                else:
+                    self.stats.list_unchanged += 1
+                logger.info(f"Task {task_label} unchanged since last check: {group_url}")
+                with self.stats.timer("commit", host), SessionLocal() as db:
+                    now = datetime.utcnow()
+                    reschedule_tasks(db, tasks, set(), now)
+                    db.query(models.PageValidator).filter(
+                        models.PageValidator.url == source_url
+                    ).update({models.PageValidator.checked_at: now})
+                    db.commit()
+                return results
+
+            entries = (
+                parse_feed(feed_url, first_page.content)
+                if feed_url and not feed_failed
+                else None
+            )
+            if feed_url and entries is None:
+                # 피드가 없어졌거나 깨졌으면 이번에는 목록 페이지로, 다음 체크 때 다시 찾아봅니다.
+                logger.warning(f"Feed unusable for Task {task_label}, scraping list: {feed_url}")
+                self._store_feed(task_ids, None, None)
+                feed_url = None
+                source_url = group_url
+                resume = False
+                first_page = await self.fetcher.fetch_list_page(group_url)
+                self.stats.list_requests += 1
+
+            if feed_url and self._feed_gap(tasks, group_url, entries):
+                # 피드를 계속 쓰되, 이번 실행만 목록 페이지를 넘기며 빠진 글까지 처리합니다.
+                logger.info(f"Feed has no seen entries for Task {task_label}, scraping list: {feed_url}")
+                self.stats.feed_gaps += 1
+                feed_url = None
+                source_url = group_url
+                resume = False
+                first_page = await self.fetcher.fetch_list_page(group_url)
+                self.stats.list_requests += 1
+
+            feed_texts: dict[str, str] = {}
+            if feed_url:
+                # 다 처리하지 못했으면 다음 실행은 검증자를 믿지 않고 피드를 다시 읽음
+                candidate_links, new_by_task, feed_texts, drained = self._feed_candidates(
+                    tasks, group_url, entries
+                )
+                high_water: dict[int, str] = {}
+            else:
+                (
+                    candidate_links,
+                    new_by_task,
+                    high_water,
+                    drained,
+                ) = await self._collect_candidate_links(
+                    tasks, group_url, first_page.html, resume=resume
+                )
+                if FEED_DISCOVERY_DAYS > 0 and first_page.html and any(
+                    task.feed_checked_at is None
+                    or now - task.feed_checked_at >= timedelta(days=FEED_DISCOVERY_DAYS)
+                    for task in tasks
+                ):
+                    found_feed = await self._discover_feed(group_url, first_page.html)
+                    self._store_feed(task_ids, found_feed, datetime.utcnow())
+
+            link_rows: list[dict] = []
+            alert_rows: list[dict] = []
+            checked_ids: list[int] = []
+            fingerprints: dict[int, bytes] = {}
+            # 새 링크가 없는 작업은 페이지 자체를 글로 취급합니다. (피드는 새 항목이 없으면 끝)
+            fallback_tasks = [
+                task for task in tasks if not feed_url and not new_by_task[task.id]
+            ]
+            if fallback_tasks:
+                # 방금 받은 목록 페이지 본문에서 추출합니다. (같은 URL을 다시 요청하지 않음)
+                text_content = await self.fetcher.extract_text(
+                    group_url, first_page.content, first_page.encoding
+                )
+                if not text_content:
+                    for task in fallback_tasks:
+                        logger.warning(f"No text extracted for Task {task.id}: {group_url}")
+                else:
+                    blocks = text_blocks(text_content)
+                    fingerprint = SeenIndex.from_urls(
+                        block_key(block) for _, block in blocks
+                    ).to_bytes(BLOCK_FINGERPRINT_MAX_ENTRIES)
+                    # 지난번과 같은 지문을 가진 작업끼리는 바뀐 블록도 같으므로 한 번만 검색
+                    by_fingerprint: dict[Optional[bytes], list[TaskSnapshot]] = {}
+                    for task in fallback_tasks:
+                        by_fingerprint.setdefault(task.block_fingerprint, []).append(task)
+                    matches: dict[int, int] = {}
+                    for previous, same_tasks in by_fingerprint.items():
+                        with self.stats.timer("match", host):
+                            found = find_in_changed_blocks(matcher, blocks, previous)
+                        for task in same_tasks:
+                            matches[task.id] = found.get(task.keyword, -1)
+                    for task in fallback_tasks:
+                        checked_ids.append(task.id)
+                        fingerprints[task.id] = fingerprint
+                        idx = matches[task.id]
+                        if idx >= 0:
+                            alert_rows.append(
+                                {
+                                    "task_id": task.id,
+                                    "url": group_url,
+                                    "match_offset": idx,
+                                    "snippet": matcher.snippet(text_content, idx),
+                                }
+                            )
+                            logger.info(
+                                f"✅ FOUND keyword '{task.keyword}' in Task {task.id}"
+                            )
+                        else:
+                            logger.info(
+                                f"❌ Keyword '{task.keyword}' not found in new or changed blocks of Task {task.id}"
+                            )
+
+            if feed_url:
+                checked_ids.extend(task.id for task in tasks if not new_by_task[task.id])
+            link_tasks = [task for task in tasks if new_by_task[task.id]]
+            checked_ids.extend(task.id for task in link_tasks)
+            # 후보 링크는 목록 단계에서 이미 task_links와 대조했으므로 다시 조회하지 않습니다.
+            # 피드에 본문이 실린 글은 상세 페이지를 받지 않습니다.
+            self.stats.feed_entries_inline += len(feed_texts)
+            futures = [
+                asyncio.ensure_future(
+                    _resolved(feed_texts[link])
+                    if link in feed_texts
+                    else self.fetcher.fetch_text(link)
+                )
+                for link in candidate_links
+            ]
+            try:
+                for link, future in zip(candidate_links, futures):
+                    text_content = await future
+                    if text_content and self.archive is not None:
+                        # 압축/파일 쓰기/LRU 정리는 이벤트 루프를 막지 않도록 스레드에서
+                        await asyncio.to_thread(self.archive.put, link, group_url, text_content)
+                    owners = [task for task in link_tasks if link in new_by_task[task.id]]
+                    with self.stats.timer("match", host):
+                        matches = matcher.find_all(text_content) if text_content else {}
+                    for task in owners:
+                        if not text_content:
+                            logger.warning(f"No text extracted for Task {task.id}: {link}")
+                        idx = matches.get(task.keyword, -1)
+                        if idx >= 0:
+                            alert_rows.append(
+                                {
+                                    "task_id": task.id,
+                                    "url": link,
+                                    "match_offset": idx,
+                                    "snippet": matcher.snippet(text_content, idx),
+                                }
+                            )
+                            logger.info(
+                                f"✅ FOUND keyword '{task.keyword}' in Task {task.id} (detail page)"
+                            )
+                        link_rows.append({"task_id": task.id, "url": link})
+
+                    if len(link_rows) >= COMMIT_BATCH_SIZE:
+                        # 중간 결과를 바로 커밋해 뒤쪽 링크가 실패해도 앞의 결과는 남깁니다.
+                        with self.stats.timer("commit", host), SessionLocal() as db:
+                            alerted = write_results(db, link_rows, alert_rows)
+                            store_seen_indexes(db, tasks, link_rows)
+                            db.commit()
+                        for task_id in alerted:
+                            results[task_id] = True
+                        self.stats.alerts_found += len(alerted)
+                        link_rows, alert_rows = [], []
+            except BaseException:
+                for future in futures:
+                    if not future.cancel() and not future.cancelled():
+                        future.exception()  # 이미 실패한 요청의 예외를 소비 (경고 방지)
+                if link_rows:
+                    # 목록 페이지 자체(fallback) 알림은 작업이 다시 체크되므로 버립니다.
+                    linked = {(row["task_id"], row["url"]) for row in link_rows}
+                    with self.stats.timer("commit", host), SessionLocal() as db:
+                        write_results(
+                            db,
+                            link_rows,
+                            [row for row in alert_rows if (row["task_id"], row["url"]) in linked],
+                        )
+                        store_seen_indexes(db, tasks, link_rows)
+                        db.commit()
+                raise
+
+            with self.stats.timer("commit", host), SessionLocal() as db:
+                alerted = write_results(db, link_rows, alert_rows)
+                store_seen_indexes(db, tasks, link_rows)
+                if first_page.content_hash is not None and checked_ids:
+                    store_validator(db, source_url, first_page, drained)
+                # 새 글이 있었거나(링크) 본문 블록이 바뀐(fallback) 작업은 더 자주 체크
+                changed_ids = {task.id for task in tasks if new_by_task[task.id]}
+                changed_ids.update(
+                    task.id
+                    for task in tasks
+                    if task.id in fingerprints and fingerprints[task.id] != task.block_fingerprint
+                )
+                reschedule_tasks(
+                    db,
+                    [task for task in tasks if task.id in checked_ids],
+                    changed_ids,
+                    datetime.utcnow(),
+                )
+                for task_id in checked_ids:
+                    if task_id in high_water:
+                        db.query(models.Task).filter(models.Task.id == task_id).update(
+                            {models.Task.high_water_url: high_water[task_id]}
+                        )
+                    if task_id in fingerprints:
+                        db.query(models.Task).filter(models.Task.id == task_id).update(
+                            {models.Task.block_fingerprint: fingerprints[task_id]}
+                        )
+                db.commit()
+            for task_id in alerted:
+                results[task_id] = True
+            self.stats.alerts_found += len(alerted)
+            return results
+
+        except httpx.HTTPError as e:
+            logger.error(f"Request error checking task {task_label}: {e}")
+            return results
+        except Exception as e:
+            logger.error(f"Error checking task {task_label}: {e}")
+            return results
+
+    def _store_feed(self, task_ids: list[int], feed_url: Optional[str], checked_at: Optional[datetime]):
+        with SessionLocal() as db:
+            db.query(models.Task).filter(models.Task.id.in_(task_ids)).update(
+                {models.Task.feed_url: feed_url, models.Task.feed_checked_at: checked_at},
+                synchronize_session=False,
+            )
+            db.commit()
+
+    async def check_task(self, task_id: int) -> bool:
+        """
+        특정 작업을 체크하고 키워드를 찾았는지 반환합니다.
+        """
+        results = await self.check_tasks([task_id])
+        return results[0]
+
+    async def check_tasks(self, task_ids: list[int]) -> list[bool]:
+        """
+        작업들을 URL별로 묶어 동시에 체크합니다. 결과는 task_ids 순서를 따릅니다.
+        """
+        self.stats.tasks_total += len(task_ids)
+        with self.stats.timer("dedup"):
+            tasks = load_task_snapshots(task_ids)
+        loaded = {task.id for task in tasks}
+        for task_id in task_ids:
+            if task_id not in loaded:
+                logger.info(f"Task {task_id} is not active or not found")
+                self.stats.tasks_done += 1
+
+        groups: dict[str, list[TaskSnapshot]] = {}
+        for task in tasks:
+            groups.setdefault(task.url, []).append(task)
+
+        async def run_group(url: str, group: list[TaskSnapshot]) -> dict[int, bool]:
+            # gather가 그룹마다 별도 태스크(컨텍스트)로 실행하므로 다른 그룹에 섞이지 않습니다.
+            current_task_ids.set(tuple(task.id for task in group))
+            try:
+                return await self.check_url(url, group)
+            finally:
+                self.stats.tasks_done += len(group)
+
+        group_results = await asyncio.gather(
+            *(run_group(url, group) for url, group in groups.items())
+        )
+        found: dict[int, bool] = {}
+        for result in group_results:
+            found.update(result)
+        return [found.get(task_id, False) for task_id in task_ids]
+
+
+async def _resolved(value):
+    return value
+
+
+def reschedule_tasks(db, tasks: list[TaskSnapshot], changed_ids: set[int], now: datetime):
+    """
+    체크를 마친 작업의 last_checked와 다음 체크 시각(next_check_at)을 기록합니다.
+    """
+    for task in tasks:
+        interval = next_interval(
+            task.current_interval_minutes,
+            task.interval_minutes,
+            task.min_interval_minutes,
+            task.max_interval_minutes,
+            task.id in changed_ids,
+        )
+        db.query(models.Task).filter(models.Task.id == task.id).update(
+            {
+                models.Task.last_checked: now,
+                models.Task.current_interval_minutes: interval,
+                models.Task.next_check_at: now + timedelta(minutes=interval),
+            }
+        )
+
+
+def find_in_changed_blocks(
+    matcher: KeywordMatcher, blocks: list[tuple[int, str]], previous: Optional[bytes]
+) -> dict[str, int]:
+    """
+    지난 체크 이후 새로 생기거나 바뀐 블록에서만 키워드를 찾습니다.
+    반환하는 위치는 전체 본문 기준입니다. 지문이 없으면(첫 체크) 모든 블록을 검색합니다.
+    """
+    seen = SeenIndex(previous) if previous else None
+    changed = [
+        (offset, block)
+        for offset, block in blocks
+        if seen is None or block_key(block) not in seen
+    ]
+    if not changed:
+        return {}
+    starts = []
+    position = 0
+    for _, block in changed:
+        starts.append(position)
+        position += len(block) + 1
+    found = matcher.find_all("\n".join(block for _, block in changed))
+    result = {}
+    for keyword, idx in found.items():
+        i = bisect.bisect_right(starts, idx) - 1
+        result[keyword] = changed[i][0] + (idx - starts[i])
+    return result
+
+
+def insert_task_links(db, rows: list[dict]) -> set[tuple[int, str]]:
+    """
+    TaskLink를 한 번에 넣고 uq_task_links_task_id_url 충돌은 건너뜁니다.
+    실제로 새로 들어간 (task_id, url) 쌍을 반환합니다.
+    """
+    if not rows:
+        return set()
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql_insert(models.TaskLink).on_conflict_do_nothing(
+            constraint="uq_task_links_task_id_url"
+        )
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(models.TaskLink).on_conflict_do_nothing(
+            index_elements=["task_id", "url"]
+        )
+    else:
+        db.execute(insert(models.TaskLink), rows)
+        return {(row["task_id"], row["url"]) for row in rows}
+    stmt = stmt.returning(models.TaskLink.task_id, models.TaskLink.url)
+    return {(task_id, url) for task_id, url in db.execute(stmt, rows)}
+
+
+def write_results(db, link_rows: list[dict], alert_rows: list[dict]) -> list[int]:
+    """
+    링크와 알림을 일괄 저장합니다. 다른 실행이 먼저 저장한 링크의 알림은 버립니다.
+    (link_rows에 없는 알림, 예: 목록 페이지 자체에서 찾은 알림은 그대로 저장)
+    저장된 알림마다 작업 ID를 하나씩 담은 목록을 반환합니다.
+    """
+    inserted = insert_task_links(db, link_rows)
+    requested = {(row["task_id"], row["url"]) for row in link_rows}
+    alerts = [
+        row
+        for row in alert_rows
+        if (row["task_id"], row["url"]) not in requested
+        or (row["task_id"], row["url"]) in inserted
+    ]
+    if alerts:
+        db.execute(insert(models.Alert), alerts)
+    return [row["task_id"] for row in alerts]
+
+
+def store_seen_indexes(db, tasks: list[TaskSnapshot], link_rows: list[dict]):
+    """
+    저장한 링크를 작업별 seen 인덱스에 반영하고, 바뀐 인덱스만 기록합니다.
+    """
+    by_id = {task.id: task for task in tasks}
+    for row in link_rows:
+        by_id[row["task_id"]].seen.add(row["url"])
+    for task in tasks:
+        if not task.seen.dirty:
+            continue
+        db.query(models.Task).filter(models.Task.id == task.id).update(
+            {models.Task.seen_index: task.seen.to_bytes(SEEN_INDEX_MAX_ENTRIES)}
+        )
+        task.seen.dirty = False
+
+
+def prune_task_links(now: datetime) -> int:
+    """
+    보관 기간이 지난 task_links 행을 지웁니다. 이미 본 URL은 seen 인덱스가 기억하므로
+    지워도 다시 알림이 생기지 않습니다. (인덱스가 없는 작업의 행은 남겨 둠)
+    """
+    if TASK_LINK_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = now - timedelta(days=TASK_LINK_RETENTION_DAYS)
+    with SessionLocal() as db:
+        indexed_tasks = db.query(models.Task.id).filter(
+            models.Task.seen_index.isnot(None)
+        )
+        deleted = (
+            db.query(models.TaskLink)
+            .filter(models.TaskLink.first_seen < cutoff)
+            .filter(models.TaskLink.task_id.in_(indexed_tasks.scalar_subquery()))
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+    if deleted:
+        logger.info(f"Pruned {deleted} task links older than {cutoff:%Y-%m-%d}")
+    return deleted
+
+
+def store_validator(db, url: str, page: ListPage, drained: bool = True):
+    """
+    목록 페이지 검증자를 저장합니다. 본문 해시가 바뀌었을 때만 changed_at을 갱신합니다.
+    drained=False면 다음 실행이 검증자를 믿지 않고 남은 글을 이어서 처리합니다.
+    """
+    now = datetime.utcnow()
+    validator = (
+        db.query(models.PageValidator).filter(models.PageValidator.url == url).first()
+    )
+    if validator is None:
+        validator = models.PageValidator(url=url, changed_at=now)
+        db.add(validator)
+    elif validator.content_hash != page.content_hash:
+        validator.changed_at = now
+    validator.etag = page.etag
+    validator.last_modified = page.last_modified
+    validator.content_hash = page.content_hash
+    validator.checked_at = now
+    validator.drained = drained
+
+
+async def check_all_tasks_async(
+    config: Optional[CrawlerConfig] = None,
+    shard: Optional[WorkerShard] = None,
+    stats: Optional[CrawlStats] = None,
+) -> dict:
+    """
+    체크 주기가 지난 활성 작업 중 이 워커(샤드)가 임대한 작업을 동시에 체크합니다.
+    """
+    shard = shard or WorkerShard(default_worker_id())
+    due_task_ids, total = lease_due_tasks(shard, datetime.utcnow())
+    logger.info(f"Found {total} active tasks, leased {len(due_task_ids)}")
+
+    try:
+        async with CrawlEngine(config, stats=stats) as engine:
+            results = await engine.check_tasks(due_task_ids)
+    finally:
+        release_leases(shard.worker_id, due_task_ids)
+    prune_task_links(datetime.utcnow())
+
+    checked_count = len(due_task_ids)
+    found_count = sum(1 for found in results if found)
+    logger.info(
+        f"✅ Checked {checked_count} tasks, found keywords in {found_count} tasks"
+    )
+    return {"checked": checked_count, "found": found_count, "total": total}
+
+
+def check_all_tasks(
+    config: Optional[CrawlerConfig] = None,
+    shard: Optional[WorkerShard] = None,
+    stats: Optional[CrawlStats] = None,
+) -> dict:
+    return asyncio.run(check_all_tasks_async(config, shard, stats))
+
+
+def backfill_task(
+    task_id: int, archive: Optional[PageArchive] = None, rescan: bool = False
+) -> int:
+    """
+    아카이브에 보관된 같은 목록 URL의 과거 글로 작업을 채우고, 저장한 알림 수를 반환합니다.
+
+    새 작업: 아직 보지 않은 글만 검색하고 task_links/seen 인덱스에 기록하므로,
+    이후 크롤링은 이 글들을 다시 내려받지 않습니다.
+    rescan=True: 키워드를 바꾼 작업용. 이미 본 글까지 모두 다시 검색해 알림만 추가합니다.
+    """
+    archive = archive or default_archive()
+    if archive is None:
+        return 0
+    tasks = load_task_snapshots([task_id])
+    if not tasks:
+        return 0
+    task = tasks[0]
+    matcher = KeywordMatcher([task.keyword])
+
+    link_rows: list[dict] = []
+    alert_rows: list[dict] = []
+    for url, text_content in archive.iter_source(task.url):
+        already_seen = url in task.seen
+        if already_seen and not rescan:
+            continue
+        idx = matcher.find(text_content, task.keyword)
+        if idx >= 0:
+            alert_rows.append(
+                {
+                    "task_id": task.id,
+                    "url": url,
+                    "match_offset": idx,
+                    "snippet": matcher.snippet(text_content, idx),
+                }
+            )
+        if not already_seen:
+            link_rows.append({"task_id": task.id, "url": url})
+
+    with SessionLocal() as db:
+        # 이미 본 글(rescan)의 알림은 link_rows에 없으므로 그대로 저장됩니다.
+        alerted = write_results(db, link_rows, alert_rows)
+        store_seen_indexes(db, [task], link_rows)
+        db.commit()
+    found = len(alerted)
+    logger.info(
+        f"Backfilled Task {task_id} from archive: "
+        f"{len(link_rows)} new pages, {found} alerts"
+    )
+    return found
+
+
+def perform_check(
+    task_id: int,
+    config: Optional[CrawlerConfig] = None,
+    stats: Optional[CrawlStats] = None,
+) -> bool:
+    """
+    단일 작업을 체크합니다. (동기 호출용 래퍼)
+    """
+
+    async def _run() -> bool:
+        async with CrawlEngine(config, stats=stats) as engine:
+            return await engine.check_task(task_id)
+
+    return asyncio.run(_run())
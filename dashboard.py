@@ -0,0 +1,111 @@
+"""
+대시보드 목록 조회 (키셋 페이지네이션)
+
+OFFSET 대신 마지막으로 보여 준 행의 (시각, id)를 커서로 넘겨 다음 페이지를 가져옵니다.
+알림은 ix_alerts_found_at / ix_alerts_task_id_found_at 인덱스를 그대로 타므로
+알림이 수만 건이어도 페이지마다 limit 행만 읽습니다.
+"""
+
+import os
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, contains_eager
+import models
+
+DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    items: list[Any]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(at: datetime, row_id: int) -> str:
+    raw = f"{at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+
+def _clamp(limit: Optional[int]) -> int:
+    return max(1, min(limit or DASHBOARD_PAGE_SIZE, MAX_PAGE_SIZE))
+
+
+def _after(column, id_column, cursor: Optional[str]):
+    """
+    (column, id) 내림차순 정렬에서 커서 다음 행 조건
+    """
+    at, row_id = decode_cursor(cursor)
+    return or_(column < at, and_(column == at, id_column < row_id))
+
+
+def task_page(db: Session, limit: Optional[int] = None, cursor: Optional[str] = None) -> Page:
+    limit = _clamp(limit)
+    query = db.query(models.Task)
+    if cursor:
+        query = query.filter(_after(models.Task.created_at, models.Task.id, cursor))
+    rows = (
+        query.order_by(models.Task.created_at.desc(), models.Task.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return Page(rows, next_cursor)
+
+
+def alert_page(
+    db: Session,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    task_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    url: Optional[str] = None,
+) -> Page:
+    """
+    알림과 작업을 한 번의 조인으로 가져옵니다. alert.task가 미리 채워져 있으므로
+    템플릿/API에서 alert.task.url을 읽어도 알림마다 쿼리가 나가지 않습니다.
+    """
+    limit = _clamp(limit)
+    query = (
+        db.query(models.Alert)
+        .join(models.Alert.task)
+        .options(contains_eager(models.Alert.task))
+    )
+    if task_id is not None:
+        query = query.filter(models.Alert.task_id == task_id)
+    if since is not None:
+        query = query.filter(models.Alert.found_at >= since)
+    if url is not None:
+        query = query.filter(models.Alert.url == url)
+    if cursor:
+        query = query.filter(_after(models.Alert.found_at, models.Alert.id, cursor))
+    rows = (
+        query.order_by(models.Alert.found_at.desc(), models.Alert.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.found_at, last.id)
+    return Page(rows, next_cursor)
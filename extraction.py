@@ -0,0 +1,154 @@
+"""
+상세 페이지 본문 추출 단계 (trafilatura / BeautifulSoup)
+
+추출은 CPU를 많이 쓰고 GIL을 잡고 있어서, 이벤트 루프에서 바로 실행하면 다운로드가
+아무리 동시에 진행되어도 한 코어에서 줄을 서게 됩니다. ExtractionQueue는 다운로드
+단계와 프로세스 풀 사이에 크기가 정해진 큐를 두어, 풀이 밀리면 다운로드 쪽이
+기다리도록(backpressure) 해서 메모리에 쌓이는 본문 수를 일정하게 유지합니다.
+
+자식 프로세스가 가볍게 import할 수 있도록 DB/크롤러 모듈에 의존하지 않습니다.
+"""
+
+import os
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+import trafilatura
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# 추출 프로세스 수 (0이면 기존처럼 이벤트 루프 안에서 바로 추출)
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# 추출을 기다리는 본문 최대 개수 (기본: 프로세스 수 x 2)
+EXTRACT_QUEUE_SIZE = int(os.getenv("EXTRACT_QUEUE_SIZE", "0"))
+
+
+def extract_page_text(content: bytes, encoding: Optional[str] = None) -> Optional[str]:
+    """
+    Try article extraction first; fallback to plain text from the same body.
+    """
+    if not content:
+        return None
+    # 인코딩을 알면(fetcher가 헤더/meta로 판별) 한 번만 디코딩해 넘겨 trafilatura의 문자셋 감지를 건너뜀
+    html = content.decode(encoding, errors="replace") if encoding else None
+    extracted = trafilatura.extract(html if html is not None else content)
+    if extracted:
+        return extracted
+    if html is None:
+        html = content.decode("utf-8", errors="replace")
+    soup = BeautifulSoup(html, "html.parser")
+    text_content = soup.get_text()
+    return text_content if text_content else None
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    실행(asyncio.run)마다 새로 띄우지 않도록 프로세스 풀은 모듈 단위로 재사용합니다.
+    """
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def _discard_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+class ExtractionQueue:
+    """
+    다운로드 단계 -> (크기 제한 큐) -> 추출 프로세스 풀
+
+    소비 코루틴은 프로세스 수만큼 띄우므로 풀에 동시에 들어가는 작업도 그만큼입니다.
+    """
+
+    def __init__(
+        self,
+        extractor: Callable[[bytes, Optional[str]], Optional[str]] = extract_page_text,
+        workers: int = EXTRACT_WORKERS,
+        queue_size: int = EXTRACT_QUEUE_SIZE,
+        in_flight: int = 0,
+    ):
+        self.extractor = extractor
+        self.workers = max(workers, 0)
+        self.queue_size = queue_size or self.workers * 2
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: list[asyncio.Task] = []
+        # 내려받는 중이거나 추출이 끝나지 않은 본문 수 제한 (동시 요청 + 큐 + 처리 중)
+        # in_flight(동시 요청 수)를 더해 두어야 추출 풀 크기가 다운로드 동시성을 줄이지 않습니다.
+        self._capacity = (
+            asyncio.Semaphore(in_flight + self.queue_size + self.workers) if self.workers else None
+        )
+
+    @asynccontextmanager
+    async def reserve(self):
+        """
+        본문을 내려받기 전에 추출 자리를 잡습니다. 풀이 밀리면 여기서 기다리므로
+        메모리에 쌓이는 본문 수가 in_flight + queue_size + workers로 제한됩니다.
+        """
+        if self._capacity is None:
+            yield
+            return
+        async with self._capacity:
+            yield
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._consumers = [
+                asyncio.create_task(self._consume()) for _ in range(self.workers)
+            ]
+
+    async def extract(self, content: bytes, encoding: Optional[str] = None) -> Optional[str]:
+        if self.workers == 0:
+            return self.extractor(content, encoding)
+        self._start()
+        future = asyncio.get_running_loop().create_future()
+        # 큐가 차 있으면 여기서 기다리므로 다운로드 단계가 추출 속도에 맞춰집니다.
+        await self._queue.put((content, encoding, future))
+        return await future
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            content, encoding, future = await self._queue.get()
+            try:
+                if future.done():  # 호출한 쪽이 이미 취소됨
+                    continue
+                pool = _process_pool(self.workers)
+                result = await loop.run_in_executor(pool, self.extractor, content, encoding)
+            except BrokenProcessPool as exc:
+                logger.error(f"Extraction worker died, restarting pool: {exc}")
+                _discard_pool()
+                if not future.done():
+                    future.set_exception(exc)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
+
+    async def aclose(self):
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self._queue = None
@@ -0,0 +1,135 @@
+"""
+RSS/Atom 피드와 사이트맵에서 새 글 후보 링크 읽기
+
+게시판이 <link rel="alternate" type="application/rss+xml"> 등으로 피드를 알려 주면
+목록 페이지 여러 장을 긁는 대신 몇 KB짜리 피드 하나로 새 글을 찾습니다.
+피드에 본문 전체(content:encoded, Atom content)가 실려 있으면 상세 페이지도 받지 않습니다.
+
+발견/선택(어느 피드가 이 게시판의 것인지)은 crawler.CrawlEngine이 목록 페이지와
+비교해서 정하고, 여기서는 HTML/XML 파싱만 합니다.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from lxml import etree
+
+FEED_TYPES = (
+    "application/rss+xml",
+    "application/atom+xml",
+    "application/rdf+xml",
+)
+
+
+@dataclass
+class FeedEntry:
+    url: str
+    # 피드에 실린 본문 전체 (텍스트). 요약만 있으면 None
+    text: Optional[str] = None
+
+
+def discover_feed_urls(base_url: str, html: str) -> list[str]:
+    """
+    페이지 <head>의 피드/사이트맵 링크를 문서 순서대로 반환합니다. (피드 먼저)
+    """
+    if not html:
+        return []
+    try:
+        root = etree.fromstring(html, etree.HTMLParser())
+    except (etree.XMLSyntaxError, ValueError):
+        return []
+    if root is None:
+        return []
+    feeds: list[str] = []
+    sitemaps: list[str] = []
+    for link in root.iter("link"):
+        href = (link.get("href") or "").strip()
+        if not href:
+            continue
+        rel = (link.get("rel") or "").lower().split()
+        kind = (link.get("type") or "").split(";")[0].strip().lower()
+        if "alternate" in rel and kind in FEED_TYPES:
+            target = feeds
+        elif "sitemap" in rel:
+            target = sitemaps
+        else:
+            continue
+        url = urljoin(base_url, href)
+        if url.startswith(("http://", "https://")) and url not in target:
+            target.append(url)
+    return feeds + sitemaps
+
+
+def _local(tag) -> str:
+    return etree.QName(tag).localname if isinstance(tag, str) else ""
+
+
+def _child(element, name: str):
+    for child in element:
+        if _local(child.tag) == name:
+            return child
+    return None
+
+
+def _child_text(element, name: str) -> str:
+    child = _child(element, name)
+    return (child.text or "").strip() if child is not None else ""
+
+
+def _html_text(markup: str) -> Optional[str]:
+    text = BeautifulSoup(markup, "html.parser").get_text("\n").strip()
+    return text or None
+
+
+def parse_feed(base_url: str, content: bytes) -> Optional[list[FeedEntry]]:
+    """
+    RSS 2.0/1.0, Atom, 사이트맵(urlset)을 최신 글 순서의 항목 목록으로 읽습니다.
+    피드가 아니거나 읽을 수 없으면 None을 반환합니다.
+    """
+    if not content:
+        return None
+    parser = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+    try:
+        root = etree.fromstring(content, parser)
+    except (etree.XMLSyntaxError, ValueError):
+        return None
+    if root is None:
+        return None
+
+    kind = _local(root.tag)
+    entries: list[FeedEntry] = []
+    if kind in ("rss", "RDF"):
+        for item in root.iter("{*}item"):
+            url = _child_text(item, "link")
+            guid = _child(item, "guid")
+            if not url and guid is not None and guid.get("isPermaLink", "true") == "true":
+                url = (guid.text or "").strip()
+            if not url:
+                continue
+            full = _child_text(item, "encoded")
+            entries.append(FeedEntry(urljoin(base_url, url), _html_text(full) if full else None))
+    elif kind == "feed":
+        for entry in root.iter("{*}entry"):
+            url = ""
+            for link in entry:
+                if _local(link.tag) == "link" and link.get("rel", "alternate") == "alternate":
+                    url = (link.get("href") or "").strip()
+                    break
+            if not url:
+                continue
+            body = _child(entry, "content")
+            full = "".join(body.itertext()).strip() if body is not None else ""
+            entries.append(FeedEntry(urljoin(base_url, url), _html_text(full) if full else None))
+    elif kind == "urlset":
+        dated = []
+        for position, item in enumerate(root.iter("{*}url")):
+            url = _child_text(item, "loc")
+            if url:
+                # lastmod는 ISO 8601 문자열이므로 문자열 비교로 최신 순 정렬 (없으면 뒤로)
+                dated.append((_child_text(item, "lastmod"), -position, url))
+        dated.sort(reverse=True)
+        entries = [FeedEntry(urljoin(base_url, url)) for _, _, url in dated]
+    else:
+        return None
+    return entries
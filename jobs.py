@@ -0,0 +1,244 @@
+"""
+API 요청에서 시작한 크롤링을 응답 이후에 실행하고 진행 상황을 조회하기 위한 작업 목록
+
+FastAPI BackgroundTasks로 응답을 먼저 보낸 뒤 JobRegistry.run을 실행합니다.
+동시에 도는 크롤링 작업 수는 JOB_CONCURRENCY로 제한하고, 나머지는 queued 상태로 기다립니다.
+
+작업 상태는 crawl_jobs 테이블에도 기록합니다. 서버리스(Vercel)나 여러 uvicorn 워커에서는
+/api/jobs/{job_id} 요청이 작업을 시작한 프로세스로 가지 않을 수 있기 때문입니다.
+실행 중인 프로세스는 JOB_HEARTBEAT_SECONDS마다 진행 상황을 기록하고, JOB_STALE_SECONDS 동안
+기록이 없는 작업은 인스턴스가 내려간 것으로 보고 실패로 보여 줍니다.
+"""
+
+import os
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from database import SessionLocal
+from metrics import CrawlStats
+import models
+
+logger = logging.getLogger(__name__)
+
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "2"))
+MAX_JOB_HISTORY = int(os.getenv("MAX_JOB_HISTORY", "100"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "5"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "120"))
+# 끝난 작업 기록을 DB에 남겨 두는 기간
+JOB_HISTORY_DAYS = int(os.getenv("JOB_HISTORY_DAYS", "7"))
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    status: str = "queued"  # queued -> running -> done / failed
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    stats: CrawlStats = field(default_factory=CrawlStats)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": self.stats.to_dict(),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def _job_from_row(row: models.CrawlJob, now: datetime) -> Job:
+    job = Job(
+        id=row.id,
+        kind=row.kind,
+        status=row.status,
+        created_at=row.created_at,
+        started_at=row.started_at,
+        finished_at=row.finished_at,
+        stats=CrawlStats(
+            tasks_total=row.tasks_total or 0,
+            tasks_done=row.tasks_done or 0,
+            pages_fetched=row.pages_fetched or 0,
+            alerts_found=row.alerts_found or 0,
+        ),
+        result=json.loads(row.result) if row.result else None,
+        error=row.error,
+    )
+    if not job.finished and row.updated_at < now - timedelta(seconds=JOB_STALE_SECONDS):
+        job.status = "failed"
+        job.error = "Job stopped reporting progress (the instance running it exited)"
+    return job
+
+
+class JobRegistry:
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, max_jobs: int = MAX_JOB_HISTORY):
+        # 이 프로세스에서 시작한 작업 (실시간 진행 상황과 /metrics용)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(concurrency)
+        self._max_jobs = max_jobs
+        # 끝난 작업들의 누적 통계 (/metrics용, 작업 기록이 정리돼도 유지)
+        self._totals = CrawlStats()
+
+    def create(self, kind: str) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            # 끝난 작업부터 오래된 순으로 정리
+            while len(self._jobs) > self._max_jobs:
+                oldest = next(
+                    (j for j in self._jobs.values() if j.finished), None
+                )
+                if oldest is None:
+                    break
+                del self._jobs[oldest.id]
+        try:
+            with SessionLocal() as db:
+                db.query(models.CrawlJob).filter(
+                    models.CrawlJob.finished_at
+                    < job.created_at - timedelta(days=JOB_HISTORY_DAYS)
+                ).delete(synchronize_session=False)
+                db.add(
+                    models.CrawlJob(
+                        id=job.id,
+                        kind=kind,
+                        status=job.status,
+                        created_at=job.created_at,
+                        updated_at=job.created_at,
+                    )
+                )
+                db.commit()
+        except Exception as e:
+            # 기록하지 못해도 작업은 실행합니다. (이 프로세스에서만 조회 가능)
+            logger.error(f"Failed to record job {job.id}: {e}")
+        return job
+
+    def _save(self, job: Job):
+        """
+        작업 상태와 진행 상황을 DB에 기록합니다.
+        """
+        stats = job.stats.to_dict()
+        try:
+            with SessionLocal() as db:
+                db.query(models.CrawlJob).filter(models.CrawlJob.id == job.id).update(
+                    {
+                        models.CrawlJob.status: job.status,
+                        models.CrawlJob.started_at: job.started_at,
+                        models.CrawlJob.finished_at: job.finished_at,
+                        models.CrawlJob.updated_at: datetime.utcnow(),
+                        models.CrawlJob.tasks_total: stats["tasks_total"],
+                        models.CrawlJob.tasks_done: stats["tasks_done"],
+                        models.CrawlJob.pages_fetched: stats["pages_fetched"],
+                        models.CrawlJob.alerts_found: stats["alerts_found"],
+                        models.CrawlJob.result: (
+                            json.dumps(job.result, default=str) if job.result is not None else None
+                        ),
+                        models.CrawlJob.error: job.error,
+                    },
+                    synchronize_session=False,
+                )
+                db.commit()
+        except Exception as e:
+            logger.error(f"Failed to save job {job.id}: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        with SessionLocal() as db:
+            row = db.get(models.CrawlJob, job_id)
+            return _job_from_row(row, datetime.utcnow()) if row else None
+
+    def find_active(self, kind: str) -> Optional[Job]:
+        """
+        같은 종류의 진행 중인 작업을 찾습니다. 다른 인스턴스가 시작한 작업도 포함하되,
+        JOB_STALE_SECONDS 동안 진행 상황을 기록하지 않은 작업은 멈춘 것으로 봅니다.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and not job.finished:
+                    return job
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            row = (
+                db.query(models.CrawlJob)
+                .filter(models.CrawlJob.kind == kind)
+                .filter(models.CrawlJob.status.in_(("queued", "running")))
+                .filter(models.CrawlJob.updated_at >= now - timedelta(seconds=JOB_STALE_SECONDS))
+                .order_by(models.CrawlJob.created_at.desc())
+                .first()
+            )
+            return _job_from_row(row, now) if row else None
+
+    def run(self, job: Job, func: Callable[[CrawlStats], Optional[dict]]):
+        """
+        백그라운드 스레드에서 호출됩니다. func는 job.stats를 받아 진행 상황을 갱신합니다.
+        """
+        # 자리를 기다리는 동안에도 기록해야 다른 인스턴스가 멈춘 작업으로 보지 않습니다.
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(JOB_HEARTBEAT_SECONDS):
+                self._save(job)
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            with self._slots:
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                self._save(job)
+                status = "failed"
+                try:
+                    job.result = func(job.stats)
+                    status = "done"
+                except Exception as e:
+                    job.error = str(e)
+                finally:
+                    # 누적 통계에 합치는 것과 상태 변경을 함께 해야 /metrics 카운터가 줄지 않습니다.
+                    with self._lock:
+                        self._totals.merge(job.stats)
+                        job.finished_at = datetime.utcnow()
+                        job.status = status
+        finally:
+            done.set()
+            self._save(job)
+
+    def stats(self) -> CrawlStats:
+        """
+        이 프로세스에서 끝난 작업 누적값 + 실행 중인 작업의 현재 값
+        """
+        combined = CrawlStats()
+        with self._lock:
+            combined.merge(self._totals)
+            for job in self._jobs.values():
+                if job.status == "running":
+                    combined.merge(job.stats)
+        return combined
+
+    def status_counts(self) -> dict[str, int]:
+        counts = {"queued": 0, "running": 0}
+        with self._lock:
+            for job in self._jobs.values():
+                if job.status in counts:
+                    counts[job.status] += 1
+        return counts
+
+
+registry = JobRegistry()
@@ -1,46 +1,62 @@
 import os
 import logging
-import re
-import requests
-import trafilatura
-from bs4 import BeautifulSoup
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Form, Depends, BackgroundTasks, HTTPException
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from urllib.parse import (
-    urljoin,
-    urlparse,
-    urlsplit,
-    urlunsplit,
-    parse_qsl,
-    urlencode,
-)
 from zoneinfo import ZoneInfo
 import models
+import jobs
+import metrics
+import dashboard
 from database import SessionLocal, engine
-
-# Initialize DB
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
-templates = Jinja2Templates(directory="templates")
+from work_queue import default_worker_id, lease_task, release_leases
 
 # 환경 확인
 IS_VERCEL = os.getenv("VERCEL") == "1"
 IS_GITHUB_ACTIONS = os.getenv("GITHUB_ACTIONS") == "true"
+# 서버리스에서는 콜드 스타트마다 스키마를 확인하지 않도록 배포 전에
+# `python migrations.py`를 따로 실행합니다. 로컬 개발에서는 시작할 때 자동으로 실행.
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "0" if IS_VERCEL else "1") == "1"
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if AUTO_MIGRATE:
+        import migrations
+
+        migrations.upgrade(engine)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+templates = Jinja2Templates(directory="templates")
+
 KST = ZoneInfo("Asia/Seoul")
-MAX_DETAIL_LINKS = int(os.getenv("MAX_DETAIL_LINKS", "30"))
-MAX_PAGES = int(os.getenv("MAX_PAGES", "5"))
-PAGE_PARAM = os.getenv("PAGE_PARAM", "page")
-ALLOW_PATH_REGEX = os.getenv("ALLOW_PATH_REGEX", "")
-DENY_PATH_REGEX = os.getenv("DENY_PATH_REGEX", "")
+# 웹 요청 안에서 실행되므로 cron보다 짧은 타임아웃을 사용
+CRAWLER_TIMEOUT = 10
+
+
+def crawl_api():
+    """
+    크롤링 모듈(httpx, bs4, lxml, trafilatura)은 불러오는 데 오래 걸리므로
+    대시보드 요청에서는 불러오지 않고 크롤링을 시작하는 경로에서만 가져옵니다.
+    """
+    import crawler
+
+    return crawler
+
+
+def crawler_config():
+    # 서버리스(Lambda 기반)에서는 /dev/shm이 없어 프로세스 풀을 띄울 수 없으므로 요청 안에서 추출
+    extract_workers = {"extract_workers": 0} if IS_VERCEL else {}
+    return crawl_api().CrawlerConfig(timeout=CRAWLER_TIMEOUT, **extract_workers)
 
 
 # Dependency
@@ -61,325 +77,196 @@ def format_kst(dt: Optional[datetime]) -> str:
     return dt.astimezone(KST).strftime("%Y-%m-%d %H:%M:%S")
 
 
-def extract_alert_link(context: Optional[str]) -> Optional[str]:
-    if not context:
-        return None
-    if context.startswith("[") and "]" in context:
-        return context.split("]", 1)[0][1:]
-    return None
-
-
-def strip_alert_link(context: Optional[str]) -> str:
-    if not context:
-        return ""
-    if context.startswith("[") and "]" in context:
-        return context.split("]", 1)[1].lstrip()
-    return context
-
+@app.get("/api/cron/check-tasks")
+def cron_check_tasks(background_tasks: BackgroundTasks):
+    """
+    GitHub Actions 또는 외부에서 호출할 수 있는 엔드포인트
+    모든 활성 작업 체크를 백그라운드 작업으로 등록하고 바로 job_id를 반환합니다.
+    진행 상황은 /api/jobs/{job_id}에서 확인합니다.
+    """
+    # 보안: API 키 확인 (선택사항)
+    api_key = os.getenv("CRON_API_KEY")
+    # 필요시 Authorization 헤더로 보안 강화
 
-def fetch_page_html(url: str) -> str:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/91.0.4472.124 Safari/537.36"
+    # 이미 진행 중인 전체 체크가 있으면 새로 시작하지 않고 그 작업을 알려줌
+    job = jobs.registry.find_active("check-tasks")
+    if job is None:
+        job = jobs.registry.create("check-tasks")
+        background_tasks.add_task(
+            jobs.registry.run,
+            job,
+            lambda stats: crawl_api().check_all_tasks(crawler_config(), stats=stats),
         )
-    }
-    response = requests.get(url, headers=headers, timeout=10)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as exc:
-        if response.status_code == 403:
-            logger.warning(f"403 Forbidden for list page: {url}")
-            return ""
-        raise exc
-    return response.text
-
-
-def extract_links(base_url: str, html: str) -> list[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    links: list[str] = []
-    seen: set[str] = set()
-    for tag in soup.find_all("a", href=True):
-        href = tag["href"].strip()
-        if not href or href.startswith("#"):
-            continue
-        if href.startswith(("javascript:", "mailto:")):
-            continue
-        absolute = urljoin(base_url, href)
-        if not absolute.startswith(("http://", "https://")):
-            continue
-        if absolute in seen:
-            continue
-        seen.add(absolute)
-        links.append(absolute)
-    return links
-
-
-def is_same_domain(base_url: str, target_url: str) -> bool:
-    try:
-        return urlparse(base_url).netloc == urlparse(target_url).netloc
-    except Exception:
-        return False
-
-
-def build_paged_url(url: str, page: int) -> str:
-    parts = urlsplit(url)
-    query = dict(parse_qsl(parts.query))
-    query[PAGE_PARAM] = str(page)
-    new_query = urlencode(query)
-    return urlunsplit(
-        (parts.scheme, parts.netloc, parts.path, new_query, parts.fragment)
+    return JSONResponse(
+        {
+            "status": job.status,
+            "job_id": job.id,
+            "status_url": f"/api/jobs/{job.id}",
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+        status_code=202,
     )
 
 
-def normalize_detail_url(url: str) -> str:
-    parts = urlsplit(url)
-    query_pairs = [(k, v) for k, v in parse_qsl(parts.query) if k != "comment_srl"]
-    new_query = urlencode(query_pairs)
-    return urlunsplit((parts.scheme, parts.netloc, parts.path, new_query, ""))
-
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.registry.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JSONResponse(job.to_dict())
 
-def should_follow_link(url: str) -> bool:
-    path = urlsplit(url).path
-    if DENY_PATH_REGEX and re.search(DENY_PATH_REGEX, path):
-        return False
-    if ALLOW_PATH_REGEX:
-        return re.search(ALLOW_PATH_REGEX, path) is not None
-    return True
 
-
-def fetch_page_text(url: str) -> Optional[str]:
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
     """
-    Try article extraction first; fallback to plain text from HTML.
+    API로 시작한 크롤링 작업의 누적 통계 (Prometheus 텍스트 형식)
     """
-    downloaded = trafilatura.fetch_url(url)
-    if downloaded:
-        extracted = trafilatura.extract(downloaded)
-        if extracted:
-            return extracted
-
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/91.0.4472.124 Safari/537.36"
-        )
+    counts = jobs.registry.status_counts()
+    body = metrics.render_prometheus(
+        jobs.registry.stats(),
+        gauges={"jobs_running": counts["running"], "jobs_queued": counts["queued"]},
+    )
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+# 대시보드 알림 목록은 최근 이 기간만 보여 줍니다.
+ALERT_DISPLAY_DAYS = 7
+
+
+def task_to_dict(task: models.Task) -> dict:
+    return {
+        "id": task.id,
+        "url": task.url,
+        "keyword": task.keyword,
+        "interval_minutes": task.interval_minutes,
+        "min_interval_minutes": task.min_interval_minutes,
+        "max_interval_minutes": task.max_interval_minutes,
+        "current_interval_minutes": task.current_interval_minutes,
+        "next_check_at": task.next_check_at.isoformat() if task.next_check_at else None,
+        "is_active": task.is_active,
+        "last_checked": task.last_checked.isoformat() if task.last_checked else None,
+        "last_checked_kst": format_kst(task.last_checked),
+        "created_at": task.created_at.isoformat() if task.created_at else None,
     }
-    response = requests.get(url, headers=headers, timeout=10)
-    try:
-        response.raise_for_status()
-    except requests.HTTPError as exc:
-        if response.status_code == 403:
-            logger.warning(f"403 Forbidden for detail page: {url}")
-            return None
-        raise exc
-    soup = BeautifulSoup(response.text, "html.parser")
-    text_content = soup.get_text()
-    return text_content if text_content else None
-
-
-def perform_check(task_id: int):
-    """
-    Background job to scrape the URL and check for the keyword.
-    """
-    db = SessionLocal()
-    try:
-        task = db.query(models.Task).filter(models.Task.id == task_id).first()
-        if not task or not task.is_active:
-            return
 
-        logger.info(f"Checking Task {task_id}: {task.url} for '{task.keyword}'")
 
-        try:
-            candidate_links: list[str] = []
-            seen_links: set[str] = set()
-            for page in range(1, MAX_PAGES + 1):
-                page_url = task.url if page == 1 else build_paged_url(task.url, page)
-                list_html = fetch_page_html(page_url)
-                links = extract_links(page_url, list_html)
-                same_domain_links = [
-                    link for link in links if is_same_domain(task.url, link)
-                ]
-                normalized_links: list[str] = []
-                for link in same_domain_links:
-                    normalized = normalize_detail_url(link)
-                    if not should_follow_link(normalized):
-                        continue
-                    normalized_links.append(normalized)
-                existing_links_page = {
-                    row[0]
-                    for row in db.query(models.TaskLink.url)
-                    .filter(models.TaskLink.task_id == task.id)
-                    .filter(models.TaskLink.url.in_(normalized_links))
-                    .all()
-                }
-                new_links_page = [
-                    link for link in normalized_links if link not in existing_links_page
-                ]
-                if not new_links_page:
-                    # No new links on this page -> older pages are likely already processed.
-                    break
-
-                for link in new_links_page:
-                    if link in seen_links:
-                        continue
-                    seen_links.add(link)
-                    candidate_links.append(link)
-                    if len(candidate_links) >= MAX_DETAIL_LINKS:
-                        break
-                if len(candidate_links) >= MAX_DETAIL_LINKS:
-                    break
-
-            if not candidate_links:
-                # Fallback: treat the page itself as an article
-                text_content = fetch_page_text(task.url)
-                if not text_content:
-                    logger.warning(f"No text extracted for Task {task_id}: {task.url}")
-                    return
-                if task.keyword in text_content:
-                    idx = text_content.find(task.keyword)
-                    start = max(0, idx - 50)
-                    end = min(len(text_content), idx + 50)
-                    context_snippet = text_content[start:end].replace("\n", " ").strip()
-                    alert = models.Alert(
-                        task_id=task.id, context=f"...{context_snippet}..."
-                    )
-                    db.add(alert)
-                    logger.info(f"FOUND keyword in Task {task_id}")
-            else:
-                existing_links = {
-                    row[0]
-                    for row in db.query(models.TaskLink.url)
-                    .filter(models.TaskLink.task_id == task.id)
-                    .filter(models.TaskLink.url.in_(candidate_links))
-                    .all()
-                }
-                new_links = [
-                    link for link in candidate_links if link not in existing_links
-                ]
-
-                for link in new_links:
-                    text_content = fetch_page_text(link)
-                    if not text_content:
-                        logger.warning(f"No text extracted for Task {task_id}: {link}")
-                        db.add(models.TaskLink(task_id=task.id, url=link))
-                        continue
-
-                    if task.keyword in text_content:
-                        idx = text_content.find(task.keyword)
-                        start = max(0, idx - 50)
-                        end = min(len(text_content), idx + 50)
-                        context_snippet = (
-                            text_content[start:end].replace("\n", " ").strip()
-                        )
-                        alert = models.Alert(
-                            task_id=task.id,
-                            context=f"[{link}] ...{context_snippet}...",
-                        )
-                        db.add(alert)
-                        logger.info(f"FOUND keyword in Task {task_id} (detail page)")
-
-                    db.add(models.TaskLink(task_id=task.id, url=link))
-
-            task.last_checked = datetime.utcnow()
-            db.commit()
-
-        except Exception as e:
-            logger.error(f"Error checking task {task_id}: {e}")
+def alert_to_dict(alert: models.Alert) -> dict:
+    return {
+        "id": alert.id,
+        "task_id": alert.task_id,
+        "keyword": alert.task.keyword,
+        "found_at": alert.found_at.isoformat() if alert.found_at else None,
+        "found_at_kst": format_kst(alert.found_at),
+        "url": alert.url,
+        "link": alert.url or alert.task.url,
+        "match_offset": alert.match_offset,
+        "snippet": alert.snippet,
+    }
 
-    finally:
-        db.close()
 
+def _page_or_400(func, *args, **kwargs) -> dashboard.Page:
+    try:
+        return func(*args, **kwargs)
+    except dashboard.InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@app.get("/api/cron/check-tasks")
-def cron_check_tasks():
+
+@app.get("/api/tasks")
+def list_tasks(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
-    GitHub Actions 또는 외부에서 호출할 수 있는 엔드포인트
-    모든 활성 작업을 체크합니다.
+    작업 목록 (최근 생성 순). 다음 페이지는 next_cursor를 cursor로 넘겨 요청합니다.
     """
-    # 보안: API 키 확인 (선택사항)
-    api_key = os.getenv("CRON_API_KEY")
-    # 필요시 Authorization 헤더로 보안 강화
+    page = _page_or_400(dashboard.task_page, db, limit, cursor)
+    return {
+        "items": [task_to_dict(task) for task in page.items],
+        "next_cursor": page.next_cursor,
+    }
 
-    db = SessionLocal()
-    try:
-        # 체크해야 할 작업들 찾기 (마지막 체크 시간 + interval_minutes가 지난 작업)
-        now = datetime.utcnow()
-        tasks = db.query(models.Task).filter(models.Task.is_active == True).all()
-
-        checked_count = 0
-        found_count = 0
-        for task in tasks:
-            # 마지막 체크 시간 확인
-            should_check = False
-            if not task.last_checked:
-                should_check = True
-            else:
-                next_check = task.last_checked + timedelta(
-                    minutes=task.interval_minutes
-                )
-                if now >= next_check:
-                    should_check = True
-
-            if should_check:
-                # perform_check는 키워드를 찾았는지 반환하지 않으므로
-                # 여기서는 단순히 체크만 수행
-                perform_check(task.id)
-                checked_count += 1
-
-        return JSONResponse(
-            {
-                "status": "success",
-                "checked_tasks": checked_count,
-                "total_tasks": len(tasks),
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-        )
-    finally:
-        db.close()
+
+@app.get("/api/alerts")
+def list_alerts(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    task_id: Optional[int] = None,
+    days: Optional[int] = None,
+    url: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    알림 목록 (최신 순). task_id로 특정 작업만, days로 최근 N일만, url로 특정 글의 알림만 볼 수 있습니다.
+    """
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+    page = _page_or_400(dashboard.alert_page, db, limit, cursor, task_id, since, url)
+    return {
+        "items": [alert_to_dict(alert) for alert in page.items],
+        "next_cursor": page.next_cursor,
+    }
 
 
 @app.get("/", response_class=HTMLResponse)
 def read_root(request: Request, db: Session = Depends(get_db)):
-    tasks = db.query(models.Task).order_by(models.Task.created_at.desc()).all()
-    # Fetch alerts for display (last 7 days)
-    cutoff = datetime.utcnow() - timedelta(days=7)
-    alerts = (
-        db.query(models.Alert)
-        .filter(models.Alert.found_at >= cutoff)
-        .order_by(models.Alert.found_at.desc())
-        .all()
+    # 첫 페이지만 렌더링하고, 나머지는 템플릿에서 /api/tasks, /api/alerts로 이어서 불러옵니다.
+    tasks = dashboard.task_page(db)
+    alerts = dashboard.alert_page(
+        db, since=datetime.utcnow() - timedelta(days=ALERT_DISPLAY_DAYS)
     )
     return templates.TemplateResponse(
         "index.html",
         {
             "request": request,
-            "tasks": tasks,
-            "alerts": alerts,
+            "tasks": tasks.items,
+            "tasks_cursor": tasks.next_cursor,
+            "alerts": alerts.items,
+            "alerts_cursor": alerts.next_cursor,
+            "alert_days": ALERT_DISPLAY_DAYS,
             "format_kst": format_kst,
-            "extract_alert_link": extract_alert_link,
-            "strip_alert_link": strip_alert_link,
         },
     )
 
 
 @app.post("/tasks/add")
 def add_task(
+    background_tasks: BackgroundTasks,
     url: str = Form(...),
     keyword: str = Form(...),
     interval_minutes: int = Form(...),
+    # 빈 입력칸은 ""로 오므로 문자열로 받아 변환
+    min_interval_minutes: Optional[str] = Form(None),
+    max_interval_minutes: Optional[str] = Form(None),
     db: Session = Depends(get_db),
 ):
     # Ensure URL has schema
     if not url.startswith("http"):
         url = "https://" + url
 
-    new_task = models.Task(url=url, keyword=keyword, interval_minutes=interval_minutes)
+    bounds = []
+    for value in (min_interval_minutes, max_interval_minutes):
+        try:
+            bounds.append(int(value) if value else None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Interval bounds must be integers")
+
+    new_task = models.Task(
+        url=url,
+        keyword=keyword,
+        interval_minutes=interval_minutes,
+        min_interval_minutes=bounds[0],
+        max_interval_minutes=bounds[1],
+    )
     db.add(new_task)
     db.commit()
     db.refresh(new_task)
 
+    # 같은 URL에서 이미 모아 둔 글이 아카이브에 있으면 다시 크롤링하지 않고 검색
+    from archive import ARCHIVE_DIR
+
+    if ARCHIVE_DIR:
+        background_tasks.add_task(crawl_api().backfill_task, new_task.id)
+
     # 새 작업 추가 시 즉시 한 번 체크 (선택사항)
     # GitHub Actions가 주기적으로 체크하므로 즉시 체크는 선택사항
     # perform_check(new_task.id)
@@ -389,21 +276,40 @@ def add_task(
 
 @app.post("/tasks/{task_id}/delete")
 def delete_task(task_id: int, db: Session = Depends(get_db)):
-    task = db.query(models.Task).filter(models.Task.id == task_id).first()
-    if task:
-        db.delete(task)
-        db.commit()
+    # 링크/알림을 세션으로 읽어 한 행씩 지우지 않고 DB에서 한 번에 지웁니다.
+    # (ON DELETE CASCADE가 없는 예전 SQLite 스키마도 있으므로 자식 행을 명시적으로 삭제)
+    for model in (models.TaskLink, models.Alert):
+        db.query(model).filter(model.task_id == task_id).delete(synchronize_session=False)
+    db.query(models.Task).filter(models.Task.id == task_id).delete(synchronize_session=False)
+    db.commit()
     return RedirectResponse(url="/", status_code=303)
 
 
 @app.post("/tasks/{task_id}/check-now")
-def check_task_now(task_id: int, db: Session = Depends(get_db)):
+def check_task_now(
+    task_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)
+):
     """
-    특정 작업을 즉시 체크하는 엔드포인트
+    특정 작업을 즉시 체크하도록 백그라운드 작업으로 등록하는 엔드포인트
     """
     task = db.query(models.Task).filter(models.Task.id == task_id).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
-    perform_check(task_id)
-    return RedirectResponse(url="/", status_code=303)
+    # cron/데몬 워커가 체크 중인 작업을 동시에 체크하지 않도록 임대한 뒤 실행합니다.
+    worker_id = default_worker_id()
+    if not lease_task(worker_id, task_id, datetime.utcnow()):
+        raise HTTPException(status_code=409, detail="Task is being checked by another worker")
+
+    def check(stats):
+        try:
+            return {"found": crawl_api().perform_check(task_id, crawler_config(), stats=stats)}
+        finally:
+            release_leases(worker_id, [task_id])
+
+    job = jobs.registry.create(f"check-task-{task_id}")
+    background_tasks.add_task(jobs.registry.run, job, check)
+    return JSONResponse(
+        {"status": job.status, "job_id": job.id, "status_url": f"/api/jobs/{job.id}"},
+        status_code=202,
+    )
@@ -0,0 +1,228 @@
+"""
+크롤링 실행 중 진행 상황 카운터와 단계별 소요 시간
+
+단계(stage)는 list_fetch, link_extract, dedup, detail_fetch, extract, match, commit이며
+호스트별로 나눠 기록합니다. 작업별 시간은 check_url이 current_task_ids에 넣어 둔 작업들에
+그대로 더해집니다(같은 URL을 보는 작업들은 같은 요청을 공유하므로).
+
+main.py의 /metrics(Prometheus 텍스트 형식)와 cron_job.py의 JSON 요약이 이 값을 씁니다.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+# 지금 실행 중인 코드가 어떤 작업(들)을 위한 것인지. asyncio 태스크마다 따로 유지됩니다.
+current_task_ids: ContextVar[tuple[int, ...]] = ContextVar("current_task_ids", default=())
+
+
+@dataclass
+class StageTiming:
+    seconds: float = 0.0
+    count: int = 0
+
+    def add(self, seconds: float, count: int = 1):
+        self.seconds += seconds
+        self.count += count
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    errors: int = 0
+    bytes: int = 0
+
+
+@dataclass
+class CrawlStats:
+    tasks_total: int = 0
+    tasks_done: int = 0
+    pages_fetched: int = 0
+    alerts_found: int = 0
+    bytes_downloaded: int = 0
+    # 목록 첫 페이지: 요청 수 / 304 응답 / 본문 해시가 같아 건너뛴 횟수
+    list_requests: int = 0
+    list_not_modified: int = 0
+    list_unchanged: int = 0
+    # 목록에서 찾은 상세 링크 중 seen 인덱스로 걸러진 것 / 새로 내려받은 것
+    links_seen: int = 0
+    links_new: int = 0
+    # 목록 대신 받은 피드 / 피드에 실린 본문으로 검색해 상세 페이지를 받지 않은 글
+    feed_requests: int = 0
+    feed_entries_inline: int = 0
+    # 피드에 이미 본 글이 없어 목록 페이지로 대신 크롤링한 횟수
+    feed_gaps: int = 0
+    # (stage, host) -> 시간, host -> 요청/바이트, task_id -> stage -> 시간
+    stages: dict[tuple[str, str], StageTiming] = field(default_factory=dict)
+    hosts: dict[str, HostStats] = field(default_factory=dict)
+    tasks: dict[int, dict[str, float]] = field(default_factory=dict)
+
+    @contextmanager
+    def timer(self, stage: str, host: str = ""):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, host, time.perf_counter() - started)
+
+    def add_time(self, stage: str, host: str, seconds: float):
+        self.stages.setdefault((stage, host), StageTiming()).add(seconds)
+        for task_id in current_task_ids.get():
+            per_task = self.tasks.setdefault(task_id, {})
+            per_task[stage] = per_task.get(stage, 0.0) + seconds
+
+    def host(self, host: str) -> HostStats:
+        return self.hosts.setdefault(host, HostStats())
+
+    def merge(self, other: "CrawlStats"):
+        for name in _COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for key, timing in list(other.stages.items()):
+            self.stages.setdefault(key, StageTiming()).add(timing.seconds, timing.count)
+        for name, host_stats in list(other.hosts.items()):
+            mine = self.host(name)
+            mine.requests += host_stats.requests
+            mine.errors += host_stats.errors
+            mine.bytes += host_stats.bytes
+        for task_id, per_task in list(other.tasks.items()):
+            mine = self.tasks.setdefault(task_id, {})
+            for stage, seconds in list(per_task.items()):
+                mine[stage] = mine.get(stage, 0.0) + seconds
+
+    def cache_ratios(self) -> dict:
+        list_hits = self.list_not_modified + self.list_unchanged
+        links = self.links_seen + self.links_new
+        return {
+            "list_cache_hit_ratio": _ratio(list_hits, self.list_requests),
+            "list_not_modified_ratio": _ratio(self.list_not_modified, self.list_requests),
+            "seen_index_hit_ratio": _ratio(self.links_seen, links),
+        }
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _PROGRESS}
+
+    def summary(self) -> dict:
+        """
+        실행 결과 전체 (JSON 직렬화 가능)
+        """
+        stages: dict[str, dict] = {}
+        for (stage, host), timing in sorted(list(self.stages.items())):
+            entry = stages.setdefault(stage, {"seconds": 0.0, "count": 0, "hosts": {}})
+            entry["seconds"] += timing.seconds
+            entry["count"] += timing.count
+            entry["hosts"][host or "*"] = {"seconds": round(timing.seconds, 4), "count": timing.count}
+        for entry in stages.values():
+            entry["seconds"] = round(entry["seconds"], 4)
+        return {
+            **{name: getattr(self, name) for name in _COUNTERS},
+            **self.cache_ratios(),
+            "stages": stages,
+            "hosts": {name: asdict(stats) for name, stats in sorted(list(self.hosts.items()))},
+            "tasks": {
+                str(task_id): {stage: round(seconds, 4) for stage, seconds in per_task.items()}
+                for task_id, per_task in sorted(list(self.tasks.items()))
+            },
+        }
+
+
+_PROGRESS = ("tasks_total", "tasks_done", "pages_fetched", "alerts_found")
+_COUNTERS = _PROGRESS + (
+    "bytes_downloaded",
+    "list_requests",
+    "list_not_modified",
+    "list_unchanged",
+    "links_seen",
+    "links_new",
+    "feed_requests",
+    "feed_entries_inline",
+    "feed_gaps",
+)
+
+
+def _ratio(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(stats: CrawlStats, gauges: Optional[dict] = None) -> str:
+    """
+    Prometheus 텍스트 노출 형식(0.0.4)으로 변환합니다. 카운터는 프로세스 시작 후 누적값입니다.
+    """
+    prefix = "keyword_crawler"
+    lines: list[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: list[tuple[dict, float]]):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+    metric("tasks_checked_total", "counter", "Tasks checked.", [({}, stats.tasks_done)])
+    metric("pages_fetched_total", "counter", "HTTP requests sent.", [({}, stats.pages_fetched)])
+    metric("alerts_found_total", "counter", "Alerts stored.", [({}, stats.alerts_found)])
+    metric("bytes_downloaded_total", "counter", "Response body bytes.", [({}, stats.bytes_downloaded)])
+    metric(
+        "list_requests_total",
+        "counter",
+        "First list page requests by outcome.",
+        [
+            ({"outcome": "not_modified"}, stats.list_not_modified),
+            ({"outcome": "unchanged"}, stats.list_unchanged),
+            ({"outcome": "changed"}, stats.list_requests - stats.list_not_modified - stats.list_unchanged),
+        ],
+    )
+    metric(
+        "detail_links_total",
+        "counter",
+        "Detail links found on list pages, by seen index result.",
+        [({"result": "seen"}, stats.links_seen), ({"result": "new"}, stats.links_new)],
+    )
+    metric("feed_requests_total", "counter", "Feeds fetched instead of list pages.", [({}, stats.feed_requests)])
+    metric(
+        "feed_entries_inline_total",
+        "counter",
+        "Feed entries matched from feed content without a detail fetch.",
+        [({}, stats.feed_entries_inline)],
+    )
+    metric(
+        "feed_gaps_total",
+        "counter",
+        "Feeds with no already-seen entry, scraped as list pages instead.",
+        [({}, stats.feed_gaps)],
+    )
+    stage_items = sorted(list(stats.stages.items()))
+    metric(
+        "stage_seconds_total",
+        "counter",
+        "Wall time spent per crawl stage and host.",
+        [({"stage": s, "host": h or "*"}, round(t.seconds, 6)) for (s, h), t in stage_items],
+    )
+    metric(
+        "stage_calls_total",
+        "counter",
+        "Calls per crawl stage and host.",
+        [({"stage": s, "host": h or "*"}, t.count) for (s, h), t in stage_items],
+    )
+    host_items = sorted(list(stats.hosts.items()))
+    metric("host_requests_total", "counter", "HTTP requests per host.", [({"host": h}, s.requests) for h, s in host_items])
+    metric("host_errors_total", "counter", "Retryable/forbidden responses per host.", [({"host": h}, s.errors) for h, s in host_items])
+    metric("host_bytes_total", "counter", "Response body bytes per host.", [({"host": h}, s.bytes) for h, s in host_items])
+    metric(
+        "task_seconds_total",
+        "counter",
+        "Wall time spent per task and stage.",
+        [
+            ({"task_id": task_id, "stage": stage}, round(seconds, 6))
+            for task_id, per_task in sorted(list(stats.tasks.items()))
+            for stage, seconds in sorted(per_task.items())
+        ],
+    )
+    for name, value in (gauges or {}).items():
+        metric(name, "gauge", name.replace("_", " ") + ".", [({}, value)])
+    return "\n".join(lines) + "\n"
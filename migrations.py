@@ -0,0 +1,184 @@
+"""
+스키마 생성 및 기존 데이터베이스에 대한 경량 마이그레이션
+
+create_all은 새 테이블만 만들기 때문에, 이미 있는 테이블에 추가된 컬럼과
+인덱스는 여기서 보충합니다. (추가 컬럼은 모두 nullable이어야 합니다)
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import bindparam, inspect, select, text, update
+from database import Base
+import models  # 모델을 메타데이터에 등록
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(conn):
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl_type = column.type.compile(dialect=conn.dialect)
+            logger.info(f"Adding column {table.name}.{column.name} ({ddl_type})")
+            conn.execute(
+                text(
+                    f"ALTER TABLE {preparer.quote(table.name)} "
+                    f"ADD COLUMN {preparer.quote(column.name)} {ddl_type}"
+                )
+            )
+
+
+def _create_missing_indexes(conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def _upgrade_foreign_keys(conn):
+    """
+    PostgreSQL: 모델에 ondelete가 지정된 외래 키를 같은 옵션으로 다시 만듭니다.
+
+    SQLite는 제약 조건을 바꿀 수 없으므로 예전 파일은 그대로 두고, 삭제 쪽
+    (main.delete_task)에서 자식 행을 직접 한 번에 지웁니다.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = inspector.get_foreign_keys(table.name)
+        for fk in table.foreign_key_constraints:
+            ondelete = (fk.ondelete or "").upper()
+            if not ondelete:
+                continue
+            columns = [column.name for column in fk.columns]
+            for current in existing:
+                if current["constrained_columns"] != columns:
+                    continue
+                if (current["options"].get("ondelete") or "").upper() == ondelete:
+                    continue
+                name = preparer.quote(current["name"])
+                target = fk.elements[0].column
+                logger.info(f"Recreating {table.name}.{current['name']} with ON DELETE {ondelete}")
+                conn.execute(text(f"ALTER TABLE {preparer.quote(table.name)} DROP CONSTRAINT {name}"))
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.quote(table.name)} ADD CONSTRAINT {name} "
+                        f"FOREIGN KEY ({', '.join(preparer.quote(c) for c in columns)}) "
+                        f"REFERENCES {preparer.quote(target.table.name)} ({preparer.quote(target.name)}) "
+                        f"ON DELETE {ondelete}"
+                    )
+                )
+
+
+def split_legacy_context(context: str) -> tuple[Optional[str], str]:
+    """
+    예전 Alert.context 형식 "[url] ...snippet..." 을 (url, snippet)으로 나눕니다.
+    """
+    url = None
+    if context.startswith("[") and "]" in context:
+        url, context = context[1:].split("]", 1)
+    snippet = context.strip()
+    if snippet.startswith("..."):
+        snippet = snippet[3:]
+    if snippet.endswith("..."):
+        snippet = snippet[:-3]
+    return url, snippet.strip()
+
+
+def _backfill_alert_columns(conn, batch_size: int = 1000):
+    """
+    url/snippet 컬럼이 생기기 전에 저장된 알림을 옮깁니다. 링크가 없던 알림은 작업 URL을 씁니다.
+    이미 옮긴 행은 snippet이 채워져 있으므로 여러 번 실행해도 안전합니다.
+    """
+    alerts = models.Alert.__table__
+    tasks = models.Task.__table__
+    query = (
+        select(alerts.c.id, alerts.c.context, tasks.c.url)
+        .select_from(alerts.outerjoin(tasks, alerts.c.task_id == tasks.c.id))
+        .where(alerts.c.snippet.is_(None), alerts.c.context.is_not(None))
+        .order_by(alerts.c.id)
+        .limit(batch_size)
+    )
+    fill = (
+        update(alerts)
+        .where(alerts.c.id == bindparam("alert_id"))
+        .values(url=bindparam("new_url"), snippet=bindparam("new_snippet"))
+    )
+    moved = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(query.where(alerts.c.id > last_id)).all()
+        if not rows:
+            break
+        params = []
+        for alert_id, context, task_url in rows:
+            url, snippet = split_legacy_context(context)
+            params.append(
+                {"alert_id": alert_id, "new_url": url or task_url, "new_snippet": snippet}
+            )
+        conn.execute(fill, params)
+        last_id = rows[-1][0]
+        moved += len(rows)
+    if moved:
+        logger.info(f"Moved {moved} legacy alert contexts into url/snippet columns")
+
+
+def _backfill_next_check_at(conn):
+    """
+    next_check_at 컬럼이 생기기 전의 작업은 last_checked + interval_minutes로 채웁니다.
+    """
+    tasks = models.Task.__table__
+    rows = conn.execute(
+        select(tasks.c.id, tasks.c.last_checked, tasks.c.interval_minutes).where(
+            tasks.c.next_check_at.is_(None)
+        )
+    ).all()
+    if not rows:
+        return
+    now = datetime.utcnow()
+    params = [
+        {
+            "task_id": task_id,
+            "due": last_checked + timedelta(minutes=interval or 0) if last_checked else now,
+        }
+        for task_id, last_checked, interval in rows
+    ]
+    conn.execute(
+        update(tasks)
+        .where(tasks.c.id == bindparam("task_id"))
+        .values(next_check_at=bindparam("due")),
+        params,
+    )
+    logger.info(f"Scheduled next_check_at for {len(params)} existing tasks")
+
+
+def upgrade(engine):
+    """
+    테이블 생성 -> 누락 컬럼 추가 -> 누락 인덱스 생성 -> 외래 키 옵션 갱신 -> 데이터 이전 순서로 적용합니다.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        _create_missing_indexes(conn)
+        _upgrade_foreign_keys(conn)
+        _backfill_alert_columns(conn)
+        _backfill_next_check_at(conn)
+
+
+if __name__ == "__main__":
+    # 배포 전에 한 번 실행: python migrations.py
+    from database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    upgrade(engine)
+    logger.info("Database schema is up to date")
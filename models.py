@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Float, ForeignKey, Index, LargeBinary, UniqueConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # 체크할 때가 된 작업을 오래 기다린 순으로 조회 (work_queue.lease_due_tasks)
+        Index("ix_tasks_active_next_check_at", "is_active", "next_check_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, index=True)
@@ -13,17 +17,49 @@ class Task(Base):
     is_active = Column(Boolean, default=True)
     last_checked = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # 다음 체크 예정 시각 (새 작업은 바로 체크)
+    next_check_at = Column(DateTime, default=datetime.utcnow, nullable=True)
+    # 적응형 체크 간격 범위(분)와 현재 간격. 범위를 비워 두면 interval_minutes 고정
+    min_interval_minutes = Column(Integer, nullable=True)
+    max_interval_minutes = Column(Integer, nullable=True)
+    current_interval_minutes = Column(Float, nullable=True)
+    # 이미 본 상세 URL의 64비트 해시 배열 (seen_index.SeenIndex)
+    seen_index = Column(LargeBinary, nullable=True)
+    # 지난 실행에서 목록 1페이지의 가장 최신 새 글 (페이지 넘기기 조기 종료용)
+    high_water_url = Column(String, nullable=True)
+    # 글 목록이 없는 페이지: 지난 체크 때 본문 블록(문단) 해시 배열 (바뀐 블록만 검색)
+    block_fingerprint = Column(LargeBinary, nullable=True)
+    # 목록 페이지에서 찾은 RSS/Atom/사이트맵 URL과 찾아본 시각 (시각만 있으면 피드 없음)
+    feed_url = Column(String, nullable=True)
+    feed_checked_at = Column(DateTime, nullable=True)
+    # 분산 실행 시 작업 임대 정보 (work_queue.py)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
 
-    alerts = relationship("Alert", back_populates="task", cascade="all, delete-orphan")
-    links = relationship("TaskLink", back_populates="task", cascade="all, delete-orphan")
+    # 자식 행은 DB의 ON DELETE CASCADE로 지웁니다 (passive_deletes: 삭제 전에 메모리로 읽지 않음)
+    alerts = relationship(
+        "Alert", back_populates="task", cascade="all, delete-orphan", passive_deletes=True
+    )
+    links = relationship(
+        "TaskLink", back_populates="task", cascade="all, delete-orphan", passive_deletes=True
+    )
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # 작업별 최신 알림 조회 (dashboard.alert_page의 task_id 필터 + 정렬)
+        Index("ix_alerts_task_id_found_at", "task_id", "found_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"))
-    found_at = Column(DateTime, default=datetime.utcnow)
-    context = Column(String)  # Short snippet where keyword was found
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"))
+    found_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # 키워드를 찾은 페이지 (상세 글, 또는 글 목록이 없을 때는 작업 URL 자체)
+    url = Column(String, nullable=True, index=True)
+    match_offset = Column(Integer, nullable=True)  # 추출한 본문에서 키워드 위치
+    snippet = Column(String, nullable=True)  # 키워드 주변 텍스트
+    # 예전 형식 "[url] ...snippet..." (migrations에서 url/snippet으로 옮김, 새 알림은 비어 있음)
+    context = Column(String, nullable=True)
     
     task = relationship("Task", back_populates="alerts")
 
@@ -34,8 +70,64 @@ class TaskLink(Base):
     )
 
     id = Column(Integer, primary_key=True, index=True)
-    task_id = Column(Integer, ForeignKey("tasks.id"))
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"))
     url = Column(String, index=True)
     first_seen = Column(DateTime, default=datetime.utcnow)
 
     task = relationship("Task", back_populates="links")
+
+class PageValidator(Base):
+    """
+    목록 페이지 URL별 HTTP 검증자(ETag / Last-Modified)와 본문 해시
+    """
+    __tablename__ = "page_validators"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True)
+    changed_at = Column(DateTime, default=datetime.utcnow)  # 본문이 마지막으로 바뀐 시각
+    checked_at = Column(DateTime, default=datetime.utcnow)
+    # False: 지난 실행이 max_detail_links에서 멈춰 아직 못 본 글이 남아 있음
+    # (검증자를 믿지 않고 이미 본 페이지도 넘겨 가며 이어서 처리)
+    drained = Column(Boolean, nullable=True)
+
+class HostPolicy(Base):
+    """
+    호스트별 robots.txt Crawl-delay 캐시
+    """
+    __tablename__ = "host_policies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    host = Column(String, unique=True, index=True)
+    crawl_delay = Column(Float, nullable=True)
+    robots_fetched_at = Column(DateTime, nullable=True)
+
+class CrawlJob(Base):
+    """
+    API로 시작한 크롤링 작업의 상태와 진행 상황 (jobs.JobRegistry)
+
+    서버리스나 여러 워커 프로세스에서는 상태 조회 요청이 작업을 시작한 인스턴스로 가지 않을 수
+    있으므로 메모리가 아니라 DB에 둡니다.
+    """
+    __tablename__ = "crawl_jobs"
+    __table_args__ = (
+        # 같은 종류의 진행 중인 작업 조회 (JobRegistry.find_active)
+        Index("ix_crawl_jobs_kind_status", "kind", "status"),
+    )
+
+    id = Column(String, primary_key=True)
+    kind = Column(String)
+    status = Column(String)  # queued -> running -> done / failed
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # 실행 중인 인스턴스가 JOB_HEARTBEAT_SECONDS마다 갱신 (멈춘 작업 판별용)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    tasks_total = Column(Integer, default=0)
+    tasks_done = Column(Integer, default=0)
+    pages_fetched = Column(Integer, default=0)
+    alerts_found = Column(Integer, default=0)
+    result = Column(String, nullable=True)  # JSON
+    error = Column(String, nullable=True)
@@ -0,0 +1,207 @@
+"""
+호스트별 요청 간격 조절 (token bucket + Retry-After + 지수 백오프 + robots.txt Crawl-delay)
+
+- 호스트(netloc)마다 token bucket을 두어 초당 HOST_RATE개까지만 요청합니다.
+  robots.txt에 Crawl-delay가 있으면 그 간격을 따릅니다.
+- 403/429/5xx 응답을 받으면 해당 호스트 전체를 Retry-After(없으면 지수 백오프)만큼 멈춥니다.
+- robots.txt에서 읽은 Crawl-delay는 host_policies 테이블에 저장해 다음 실행에서도 재사용합니다.
+"""
+
+import os
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+import httpx
+from database import SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+HOST_RATE = float(os.getenv("HOST_RATE", "4"))  # 호스트당 초당 요청 수
+HOST_BURST = int(os.getenv("HOST_BURST", "4"))
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
+BACKOFF_BASE_SECONDS = float(os.getenv("BACKOFF_BASE_SECONDS", "2"))
+MAX_BACKOFF_SECONDS = float(os.getenv("MAX_BACKOFF_SECONDS", "120"))
+ROBOTS_TTL_HOURS = int(os.getenv("ROBOTS_TTL_HOURS", "24"))
+
+RETRY_STATUS = {403, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 바꿉니다.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def parse_crawl_delay(robots_txt: str, user_agent: str) -> Optional[float]:
+    """
+    robots.txt에서 Crawl-delay를 읽습니다. 우리 User-Agent에 맞는 그룹을 "*"보다 우선합니다.
+    (urllib.robotparser는 소수 Crawl-delay를 무시하므로 직접 파싱)
+    """
+    user_agent = user_agent.lower()
+    specific: Optional[float] = None
+    wildcard: Optional[float] = None
+    agents: list[str] = []
+    in_rules = False
+    for raw_line in robots_txt.splitlines():
+        line = raw_line.split("#", 1)[0].strip()
+        if ":" not in line:
+            continue
+        field_name, value = (part.strip() for part in line.split(":", 1))
+        field_name = field_name.lower()
+        if field_name == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+            continue
+        in_rules = True
+        if field_name != "crawl-delay":
+            continue
+        try:
+            delay = float(value)
+        except ValueError:
+            continue
+        for agent in agents:
+            if agent == "*":
+                wildcard = delay if wildcard is None else wildcard
+            elif agent and agent in user_agent:
+                specific = delay if specific is None else specific
+    delay = specific if specific is not None else wildcard
+    return delay if delay and delay > 0 else None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """
+        토큰 하나를 예약하고, 그 토큰을 쓰기까지 기다려야 할 시간(초)을 반환합니다.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostScheduler:
+    """
+    한 실행 동안 Fetcher가 공유하는 호스트별 스케줄러
+    """
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self._buckets: dict[str, TokenBucket] = {}
+        self._blocked_until: dict[str, float] = {}
+        self._init_locks: dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, url: str):
+        """
+        이 호스트에 요청을 보내도 될 때까지 기다립니다.
+        """
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = await self._init_host(url, host)
+        while True:
+            blocked = self._blocked_until.get(host, 0.0) - time.monotonic()
+            if blocked > 0:
+                await asyncio.sleep(blocked)
+                continue
+            wait = bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            # 기다리는 동안 백오프가 걸렸으면 다시 기다립니다.
+            if self._blocked_until.get(host, 0.0) <= time.monotonic():
+                return
+
+    def backoff(self, url: str, response: httpx.Response, attempt: int) -> float:
+        """
+        호스트 전체를 잠시 멈추고 멈춘 시간(초)을 반환합니다.
+        """
+        host = urlsplit(url).netloc
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = BACKOFF_BASE_SECONDS * (2**attempt) * (1 + random.random() / 2)
+        delay = min(delay, MAX_BACKOFF_SECONDS)
+        until = time.monotonic() + delay
+        self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), until)
+        logger.warning(
+            f"{response.status_code} from {host}, backing off {delay:.1f}s "
+            f"(attempt {attempt + 1})"
+        )
+        return delay
+
+    async def _init_host(self, url: str, host: str) -> TokenBucket:
+        lock = self._init_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            if host in self._buckets:
+                return self._buckets[host]
+            crawl_delay = await self._crawl_delay(url, host)
+            if crawl_delay:
+                bucket = TokenBucket(min(HOST_RATE, 1 / crawl_delay), 1)
+            else:
+                bucket = TokenBucket(HOST_RATE, HOST_BURST)
+            self._buckets[host] = bucket
+            return bucket
+
+    async def _crawl_delay(self, url: str, host: str) -> Optional[float]:
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            policy = (
+                db.query(models.HostPolicy).filter(models.HostPolicy.host == host).first()
+            )
+            if policy and policy.robots_fetched_at and (
+                now - policy.robots_fetched_at < timedelta(hours=ROBOTS_TTL_HOURS)
+            ):
+                return policy.crawl_delay
+
+        crawl_delay = await self._fetch_robots_delay(url)
+        with SessionLocal() as db:
+            policy = (
+                db.query(models.HostPolicy).filter(models.HostPolicy.host == host).first()
+            )
+            if policy is None:
+                policy = models.HostPolicy(host=host)
+                db.add(policy)
+            policy.crawl_delay = crawl_delay
+            policy.robots_fetched_at = now
+            db.commit()
+        if crawl_delay:
+            logger.info(f"robots.txt Crawl-delay for {host}: {crawl_delay}s")
+        return crawl_delay
+
+    async def _fetch_robots_delay(self, url: str) -> Optional[float]:
+        parts = urlsplit(url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        try:
+            response = await self.client.get(robots_url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to fetch {robots_url}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        return parse_crawl_delay(
+            response.text, self.client.headers.get("User-Agent", "")
+        )
@@ -0,0 +1,247 @@
+"""
+상주(daemon) 모드 스케줄러
+
+cron_job.py --daemon으로 실행하면 프로세스가 계속 떠 있으면서 HTTP 클라이언트,
+본문 추출 프로세스 풀, DB 커넥션 풀을 재사용합니다. 다음 체크 시각(next_check_at)
+순서의 힙을 들고 있다가 가장 이른 시각까지 잠들고, 때가 된 작업만 임대해 체크합니다.
+
+- 힙은 DAEMON_REFRESH_SECONDS마다 DB에서 다시 읽어 웹에서 추가/삭제된 작업과
+  다른 워커가 체크한 결과를 반영합니다. (그 사이에 올 작업만 ix_tasks_active_next_check_at으로 조회)
+- 같은 URL을 보는 작업이 이미 체크 중이면 끝날 때까지 미룹니다.
+- SIGTERM/SIGINT를 받으면 새 체크를 시작하지 않고, 진행 중인 체크를
+  DAEMON_SHUTDOWN_SECONDS까지 기다린 뒤 임대를 풀고 종료합니다.
+"""
+
+import os
+import asyncio
+import heapq
+import logging
+import signal
+from datetime import datetime, timedelta
+from typing import Optional
+from crawler import CrawlEngine, CrawlerConfig, prune_task_links
+from database import SessionLocal
+from metrics import CrawlStats
+from work_queue import WorkerShard, due_filter, lease_due_tasks, release_leases
+import models
+
+logger = logging.getLogger(__name__)
+
+DAEMON_REFRESH_SECONDS = int(os.getenv("DAEMON_REFRESH_SECONDS", "60"))
+# 체크가 실패해 next_check_at이 그대로인 작업은 이만큼 뒤에 다시 시도
+DAEMON_RETRY_SECONDS = int(os.getenv("DAEMON_RETRY_SECONDS", "300"))
+DAEMON_PRUNE_SECONDS = int(os.getenv("DAEMON_PRUNE_SECONDS", "3600"))
+DAEMON_SHUTDOWN_SECONDS = int(os.getenv("DAEMON_SHUTDOWN_SECONDS", "25"))
+# 힙 갱신/정리가 DB 오류로 실패하면 이만큼 뒤에 다시 시도
+DAEMON_ERROR_RETRY_SECONDS = int(os.getenv("DAEMON_ERROR_RETRY_SECONDS", "10"))
+
+
+class TaskScheduler:
+    """
+    (다음 체크 시각, 작업 ID, URL) 최소 힙으로 작업을 체크하는 상주 루프
+    """
+
+    def __init__(
+        self,
+        shard: WorkerShard,
+        config: Optional[CrawlerConfig] = None,
+        stats: Optional[CrawlStats] = None,
+        refresh_seconds: int = DAEMON_REFRESH_SECONDS,
+    ):
+        self.shard = shard
+        self.config = config
+        self.stats = stats or CrawlStats()
+        self.refresh_seconds = refresh_seconds
+        self.checked = 0
+        self.found = 0
+        self._heap: list[tuple[datetime, int, str]] = []
+        # 힙에 든 작업의 예정 시각. 값이 다른 힙 항목은 지난 것이므로 꺼낼 때 버립니다.
+        self._queued: dict[int, datetime] = {}
+        self._running: set[int] = set()
+        self._running_urls: set[str] = set()
+        self._deferred: dict[str, list[tuple[datetime, int, str]]] = {}
+        self._batches: set[asyncio.Task] = set()
+        self._next_refresh = datetime.min
+        self._stop = asyncio.Event()
+        self._wake = asyncio.Event()
+
+    def stop(self):
+        if not self._stop.is_set():
+            logger.info("Stop requested; waiting for running checks")
+        self._stop.set()
+        self._wake.set()
+
+    def _push(self, due: datetime, task_id: int, url: str):
+        self._queued[task_id] = due
+        heapq.heappush(self._heap, (due, task_id, url))
+
+    def refresh(self, now: datetime):
+        """
+        now + refresh_seconds 안에 체크할 작업으로 힙을 다시 만듭니다.
+        """
+        horizon = now + timedelta(seconds=self.refresh_seconds)
+        with SessionLocal() as db:
+            rows = due_filter(
+                db.query(models.Task.id, models.Task.url, models.Task.next_check_at),
+                horizon,
+            ).all()
+        self._heap = []
+        self._queued = {}
+        self._deferred = {}
+        for task_id, url, next_check_at in rows:
+            if task_id in self._running or not self.shard.owns(url):
+                continue
+            self._push(next_check_at or now, task_id, url)
+
+    def _reschedule(self, task_ids: list[int], now: datetime):
+        """
+        체크가 끝난 작업을 DB의 새 next_check_at으로 힙에 다시 넣습니다.
+        """
+        with SessionLocal() as db:
+            rows = (
+                db.query(models.Task.id, models.Task.url, models.Task.next_check_at)
+                .filter(models.Task.id.in_(task_ids))
+                .filter(models.Task.is_active == True)
+                .all()
+            )
+        retry_at = now + timedelta(seconds=DAEMON_RETRY_SECONDS)
+        for task_id, url, next_check_at in rows:
+            # 실패했거나 다른 워커가 임대 중이라 체크하지 못한 작업
+            due = next_check_at if next_check_at and next_check_at > now else retry_at
+            if due <= now + timedelta(seconds=self.refresh_seconds):
+                self._push(due, task_id, url)
+
+    def _pop_due(self, now: datetime) -> list[tuple[int, str]]:
+        due_tasks: list[tuple[int, str]] = []
+        while self._heap and self._heap[0][0] <= now:
+            due, task_id, url = heapq.heappop(self._heap)
+            if self._queued.get(task_id) != due:
+                continue
+            del self._queued[task_id]
+            if url in self._running_urls:
+                self._deferred.setdefault(url, []).append((due, task_id, url))
+                continue
+            due_tasks.append((task_id, url))
+        return due_tasks
+
+    async def _run_batch(self, engine: CrawlEngine, task_ids: list[int], urls: set[str]):
+        leased: list[int] = []
+        try:
+            # 힙이 DB보다 늦을 수 있으므로 임대할 때 주기가 지났는지 다시 확인합니다.
+            leased, _ = lease_due_tasks(self.shard, datetime.utcnow(), task_ids)
+            if leased:
+                results = await engine.check_tasks(leased)
+                self.checked += len(leased)
+                self.found += sum(1 for found in results if found)
+        finally:
+            self._running.difference_update(task_ids)
+            self._running_urls.difference_update(urls)
+            try:
+                release_leases(self.shard.worker_id, leased)
+            except Exception as e:
+                # 풀지 못한 임대는 TASK_LEASE_SECONDS가 지나면 만료됩니다.
+                logger.error(f"Releasing leases failed for {len(leased)} tasks: {e}")
+            if not self._stop.is_set():
+                try:
+                    self._reschedule(task_ids, datetime.utcnow())
+                except Exception as e:
+                    # 힙에서 빠진 작업은 다음 틱의 refresh가 DB에서 다시 읽어 옵니다.
+                    logger.error(f"Rescheduling {len(task_ids)} tasks failed: {e}")
+                    self._next_refresh = datetime.min
+                for url in urls:
+                    for entry in self._deferred.pop(url, []):
+                        self._push(*entry)
+            self._wake.set()
+
+    def _start_batch(self, engine: CrawlEngine, due_tasks: list[tuple[int, str]]):
+        task_ids = [task_id for task_id, _ in due_tasks]
+        urls = {url for _, url in due_tasks}
+        # 태스크가 시작되기 전에 표시해야 다음 _pop_due가 같은 URL을 미룹니다.
+        self._running.update(task_ids)
+        self._running_urls.update(urls)
+        batch = asyncio.create_task(self._run_batch(engine, task_ids, urls))
+        self._batches.add(batch)
+        batch.add_done_callback(self._batch_done)
+
+    def _batch_done(self, batch: asyncio.Task):
+        self._batches.discard(batch)
+        if not batch.cancelled() and batch.exception():
+            logger.error(f"Scheduled check failed: {batch.exception()}")
+
+    async def run(self) -> dict:
+        """
+        stop()이 호출될 때까지 작업을 체크하고 누적 결과를 반환합니다.
+        """
+        next_prune = datetime.utcnow() + timedelta(seconds=DAEMON_PRUNE_SECONDS)
+        retry = timedelta(seconds=DAEMON_ERROR_RETRY_SECONDS)
+        async with CrawlEngine(self.config, stats=self.stats) as engine:
+            while not self._stop.is_set():
+                now = datetime.utcnow()
+                if now >= self._next_refresh:
+                    try:
+                        self.refresh(now)
+                        self._next_refresh = now + timedelta(seconds=self.refresh_seconds)
+                    except Exception as e:
+                        # 지난 힙을 그대로 쓰면서 잠시 뒤 다시 읽습니다.
+                        logger.error(f"Refreshing schedule failed: {e}")
+                        self._next_refresh = now + retry
+                if now >= next_prune:
+                    try:
+                        prune_task_links(now)
+                        next_prune = now + timedelta(seconds=DAEMON_PRUNE_SECONDS)
+                    except Exception as e:
+                        logger.error(f"Pruning task links failed: {e}")
+                        next_prune = now + retry
+
+                due_tasks = self._pop_due(now)
+                if due_tasks:
+                    logger.info(f"Scheduling {len(due_tasks)} due tasks")
+                    self._start_batch(engine, due_tasks)
+
+                wake_at = self._next_refresh
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+                timeout = max((wake_at - datetime.utcnow()).total_seconds(), 0)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+            if self._batches:
+                _, pending = await asyncio.wait(
+                    set(self._batches), timeout=DAEMON_SHUTDOWN_SECONDS
+                )
+                for batch in pending:
+                    batch.cancel()
+                if pending:
+                    logger.warning(f"Cancelled {len(pending)} checks at shutdown")
+                    await asyncio.gather(*pending, return_exceptions=True)
+        return {"checked": self.checked, "found": self.found}
+
+
+async def run_daemon(
+    shard: WorkerShard,
+    config: Optional[CrawlerConfig] = None,
+    stats: Optional[CrawlStats] = None,
+) -> dict:
+    """
+    SIGTERM/SIGINT에 멈추도록 신호 처리기를 걸고 스케줄러를 실행합니다.
+    """
+    scheduler = TaskScheduler(shard, config, stats)
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, scheduler.stop)
+        except NotImplementedError:
+            # Windows 이벤트 루프
+            signal.signal(signum, lambda *_: loop.call_soon_threadsafe(scheduler.stop))
+    logger.info(f"Daemon started (worker {shard.worker_id})")
+    try:
+        return await scheduler.run()
+    finally:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.remove_signal_handler(signum)
+            except NotImplementedError:
+                signal.signal(signum, signal.SIG_DFL)
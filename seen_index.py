@@ -0,0 +1,63 @@
+"""
+작업별로 이미 본 상세 URL을 64비트 해시 배열로 기억하는 인덱스
+
+task_links 테이블을 매번 IN 조회하지 않고, 실행 시작 시 한 번 읽어 메모리에서
+판단합니다. 배열은 추가 순서를 유지하므로 오래된 항목부터 잘라낼 수 있습니다.
+"""
+
+import sys
+import hashlib
+from array import array
+from typing import Iterable, Optional
+
+
+def url_hash(url: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+class SeenIndex:
+    def __init__(self, data: Optional[bytes] = None):
+        self._order = array("Q")
+        if data:
+            self._order.frombytes(data)
+            if sys.byteorder == "big":
+                self._order.byteswap()
+        self._set = set(self._order)
+        self.dirty = False
+
+    @classmethod
+    def from_urls(cls, urls: Iterable[str]) -> "SeenIndex":
+        index = cls()
+        index.update(urls)
+        return index
+
+    def __contains__(self, url: str) -> bool:
+        return url_hash(url) in self._set
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, url: str):
+        value = url_hash(url)
+        if value not in self._set:
+            self._set.add(value)
+            self._order.append(value)
+            self.dirty = True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def to_bytes(self, max_entries: int) -> bytes:
+        """
+        최근 max_entries개만 남겨 직렬화합니다. (항상 little-endian)
+        """
+        if len(self._order) > max_entries:
+            self._order = self._order[-max_entries:]
+            self._set = set(self._order)
+        data = array("Q", self._order)
+        if sys.byteorder == "big":
+            data.byteswap()
+        return data.tobytes()
@@ -0,0 +1,181 @@
+"""
+여러 워커가 작업을 나눠 가져가기 위한 DB 기반 작업 임대(lease)
+
+PostgreSQL에서는 잠그지 않고 읽은 후보 중 이 샤드가 맡을 행만
+SELECT ... FOR UPDATE SKIP LOCKED로 잠근 뒤
+lease_owner / lease_expires_at을 기록하므로, 동시에 실행된 워커끼리 같은 작업을
+가져가지 않습니다. 임대는 실행이 끝나면 해제되고, 워커가 죽으면 만료 시각이 지나
+다른 워커가 다시 가져갈 수 있습니다.
+
+SQLite는 행 잠금이 없으므로 단일 워커 모드로 동작합니다. (샤드 0만 실행)
+
+체크 시점은 tasks.next_check_at(인덱스)에 저장해 두고 DB에서 바로 골라냅니다.
+게시판에 새 글이 자주 올라오는 작업은 체크 간격을 줄이고, 조용한 작업은 늘립니다.
+(min_interval_minutes ~ max_interval_minutes 범위, 지정하지 않으면 interval_minutes 고정)
+"""
+
+import os
+import socket
+import logging
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_
+from database import SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "1800"))
+# 한 번의 실행에서 가져갈 최대 작업 수 (나머지는 다음 실행에서 오래 기다린 순으로)
+DUE_TASK_LIMIT = int(os.getenv("DUE_TASK_LIMIT", "500"))
+# 새 글이 있으면 간격 x SPEEDUP, 없으면 x SLOWDOWN
+ADAPTIVE_SPEEDUP = float(os.getenv("ADAPTIVE_SPEEDUP", "0.5"))
+ADAPTIVE_SLOWDOWN = float(os.getenv("ADAPTIVE_SLOWDOWN", "1.5"))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class WorkerShard:
+    """
+    이 워커의 이름과 담당 샤드. URL 해시로 나누므로 같은 URL의 작업은 한 샤드에 모입니다.
+    """
+
+    worker_id: str
+    shard_id: int = 0
+    shard_count: int = 1
+
+    def owns(self, url: str) -> bool:
+        if self.shard_count <= 1:
+            return True
+        return zlib.crc32(url.encode("utf-8")) % self.shard_count == self.shard_id
+
+
+def next_interval(
+    current: Optional[float],
+    interval_minutes: int,
+    min_minutes: Optional[int],
+    max_minutes: Optional[int],
+    changed: bool,
+) -> float:
+    """
+    이번 체크에서 새 내용이 있었는지에 따라 다음 체크 간격(분)을 정합니다.
+    """
+    low = min_minutes or interval_minutes
+    high = max(max_minutes or interval_minutes, low)
+    current = current or interval_minutes
+    current *= ADAPTIVE_SPEEDUP if changed else ADAPTIVE_SLOWDOWN
+    return min(max(current, low), high)
+
+
+def due_filter(query, now: datetime):
+    return query.filter(models.Task.is_active == True).filter(
+        or_(models.Task.next_check_at.is_(None), models.Task.next_check_at <= now)
+    )
+
+
+def lease_free(query, now: datetime):
+    return query.filter(
+        or_(
+            models.Task.lease_expires_at.is_(None),
+            models.Task.lease_expires_at < now,
+        )
+    )
+
+
+def lease_due_tasks(
+    shard: WorkerShard, now: datetime, task_ids: Optional[list[int]] = None
+) -> tuple[list[int], int]:
+    """
+    이 샤드가 맡을, 체크 주기가 지난 작업을 임대하고 (작업 ID 목록, 전체 활성 작업 수)를 반환합니다.
+    task_ids를 넘기면 그 중에서만 고릅니다. (데몬 스케줄러가 힙에서 꺼낸 작업)
+    """
+    with SessionLocal() as db:
+        dialect = db.get_bind().dialect.name
+        if dialect != "postgresql" and shard.shard_count > 1:
+            if shard.shard_id != 0:
+                logger.warning(
+                    f"{dialect} does not support row locking; "
+                    f"shard {shard.shard_id} exits (single-worker mode)"
+                )
+                return [], 0
+            logger.warning(f"{dialect}: running shard 0 as a single worker")
+            shard = WorkerShard(shard.worker_id)
+
+        total = (
+            db.query(models.Task.id).filter(models.Task.is_active == True).count()
+        )
+        # 1단계: ix_tasks_active_next_check_at으로 체크할 때가 된 행만 오래 기다린 순으로
+        # 잠그지 않고 읽어, 이 샤드가 맡을 ID만 고릅니다.
+        # (여기서 잠그면 다른 샤드의 행까지 잠가 동시에 실행된 샤드가 아무것도 못 가져감)
+        candidates = lease_free(
+            due_filter(db.query(models.Task.id, models.Task.url), now), now
+        ).order_by(models.Task.next_check_at, models.Task.id)
+        if task_ids is not None:
+            candidates = candidates.filter(models.Task.id.in_(task_ids))
+        if shard.shard_count <= 1 and DUE_TASK_LIMIT > 0:
+            # 샤드로 나누면 URL 해시를 파이썬에서 거르므로 LIMIT은 아래 반복문에서 적용
+            candidates = candidates.limit(DUE_TASK_LIMIT)
+        owned: list[int] = []
+        for task_id, url in candidates.all():
+            if not shard.owns(url):
+                continue
+            owned.append(task_id)
+            if DUE_TASK_LIMIT > 0 and len(owned) >= DUE_TASK_LIMIT:
+                break
+        if not owned:
+            return [], total
+
+        # 2단계: 고른 행만 조건을 다시 확인하며 잠급니다. 그 사이 다른 워커가 임대했거나
+        # 임대 중인 행은 건너뜁니다. 잠금은 commit 시 풀립니다.
+        query = lease_free(
+            due_filter(db.query(models.Task), now), now
+        ).filter(models.Task.id.in_(owned))
+        if dialect == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+
+        lease_until = now + timedelta(seconds=TASK_LEASE_SECONDS)
+        leased: list[int] = []
+        for task in query.order_by(models.Task.next_check_at, models.Task.id).all():
+            task.lease_owner = shard.worker_id
+            task.lease_expires_at = lease_until
+            leased.append(task.id)
+        db.commit()
+        return leased, total
+
+
+def lease_task(worker_id: str, task_id: int, now: datetime) -> bool:
+    """
+    체크 주기와 상관없이 작업 하나를 임대합니다. (즉시 체크)
+    다른 워커가 임대 중이면 False를 반환합니다.
+    """
+    with SessionLocal() as db:
+        # 조건부 UPDATE 한 문장이라 잠금 없이도 두 워커가 함께 가져가지 않습니다.
+        updated = lease_free(
+            db.query(models.Task).filter(models.Task.id == task_id), now
+        ).update(
+            {
+                models.Task.lease_owner: worker_id,
+                models.Task.lease_expires_at: now + timedelta(seconds=TASK_LEASE_SECONDS),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return updated == 1
+
+
+def release_leases(worker_id: str, task_ids: list[int]):
+    if not task_ids:
+        return
+    with SessionLocal() as db:
+        db.query(models.Task).filter(models.Task.id.in_(task_ids)).filter(
+            models.Task.lease_owner == worker_id
+        ).update(
+            {models.Task.lease_owner: None, models.Task.lease_expires_at: None},
+            synchronize_session=False,
+        )
+        db.commit()